@@ -0,0 +1,114 @@
+"""
+Cheap file-type probes via the Linux ``statx`` syscall.
+
+``os.stat`` fills a full stat struct and, on network filesystems, can
+force an attribute sync with the server.  ``statx`` called with
+``AT_STATX_DONT_SYNC`` and a ``STATX_TYPE`` mask asks the kernel for
+just the type bits from whatever attributes it already has cached.
+The libc wrapper is probed once at import; platforms or kernels
+without it (pre-4.11) fall back to ``os.path.isfile``/``isdir``.
+"""
+
+import os
+import sys
+import stat as statmod
+import ctypes
+import ctypes.util
+
+AT_FDCWD = -100
+AT_STATX_DONT_SYNC = 0x4000
+STATX_TYPE = 0x0001
+
+
+class _StatxTimestamp(ctypes.Structure):
+    _fields_ = [('tv_sec', ctypes.c_longlong),
+                ('tv_nsec', ctypes.c_uint),
+                ('_reserved', ctypes.c_int)]
+
+
+class _Statx(ctypes.Structure):
+    _fields_ = [('stx_mask', ctypes.c_uint),
+                ('stx_blksize', ctypes.c_uint),
+                ('stx_attributes', ctypes.c_ulonglong),
+                ('stx_nlink', ctypes.c_uint),
+                ('stx_uid', ctypes.c_uint),
+                ('stx_gid', ctypes.c_uint),
+                ('stx_mode', ctypes.c_ushort),
+                ('_spare0', ctypes.c_ushort),
+                ('stx_ino', ctypes.c_ulonglong),
+                ('stx_size', ctypes.c_ulonglong),
+                ('stx_blocks', ctypes.c_ulonglong),
+                ('stx_attributes_mask', ctypes.c_ulonglong),
+                ('stx_atime', _StatxTimestamp),
+                ('stx_btime', _StatxTimestamp),
+                ('stx_ctime', _StatxTimestamp),
+                ('stx_mtime', _StatxTimestamp),
+                ('stx_rdev_major', ctypes.c_uint),
+                ('stx_rdev_minor', ctypes.c_uint),
+                ('stx_dev_major', ctypes.c_uint),
+                ('stx_dev_minor', ctypes.c_uint),
+                ('_spare2', ctypes.c_ulonglong * 14)]
+
+
+_statx = None
+if sys.platform.startswith('linux'):
+    try:
+        _libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6',
+                            use_errno=True)
+        _statx = _libc.statx
+        _statx.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int,
+                           ctypes.c_uint, ctypes.POINTER(_Statx)]
+        _statx.restype = ctypes.c_int
+        # Probe once; ENOSYS or a libc without the wrapper disables it
+        # for the life of the process.
+        _buf = _Statx()
+        if _statx(AT_FDCWD, b'.', AT_STATX_DONT_SYNC, STATX_TYPE,
+                  ctypes.byref(_buf)) != 0:
+            _statx = None
+        del _buf
+    except (AttributeError, OSError):  # pragma no cover
+        _statx = None
+
+
+def _statx_mode(path):
+    """
+    Return stx_mode for `path`, or None if statx fails for it.
+
+    path: string
+        Path to interrogate.
+    """
+    if not isinstance(path, bytes):
+        path = path.encode('utf-8')
+    buf = _Statx()
+    if _statx(AT_FDCWD, path, AT_STATX_DONT_SYNC, STATX_TYPE,
+              ctypes.byref(buf)) != 0:
+        return None
+    if not buf.stx_mask & STATX_TYPE:
+        return None
+    return buf.stx_mode
+
+
+def is_file(path):
+    """
+    Return True if `path` names a regular file.
+
+    path: string
+        Path to interrogate.
+    """
+    if _statx is not None:
+        mode = _statx_mode(path)
+        return mode is not None and statmod.S_ISREG(mode)
+    return os.path.isfile(path)
+
+
+def is_dir(path):
+    """
+    Return True if `path` names a directory.
+
+    path: string
+        Path to interrogate.
+    """
+    if _statx is not None:
+        mode = _statx_mode(path)
+        return mode is not None and statmod.S_ISDIR(mode)
+    return os.path.isdir(path)
@@ -1,8 +1,122 @@
 
+import re
 import logging
 import numpy
 from analysis_server.varwrapper import VarWrapper, _register
 
+# Tokenizes 'bounds[dims] {vals}' payloads in one scan.
+_BOUNDS_RE = re.compile(r'bounds\[([^\]]+)\]\s*\{([^}]*)\}')
+
+# Module-level bindings for the numpy C-level helpers used on hot paths.
+_char_mod = numpy.char.mod
+_char_strip = numpy.char.strip
+_fromstring = numpy.fromstring
+
+# Map from element type to numpy dtype used when parsing numeric payloads.
+_NP_DTYPES = {float: numpy.float64, int: numpy.int64}
+
+# Full-payload screens for comma-joined numeric tokens, per element
+# type.  fromstring is only trusted when the whole payload matches --
+# it stops quietly at the first character it can't consume, so a loose
+# screen would let a truncated parse through.  Anything else takes the
+# per-token path, which raises ValueError on bad tokens the way the
+# old parser did.
+_FLOAT_TOK = r'[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?'
+_INT_TOK = r'[+-]?\d+'
+_NUMERIC_RES = {
+    float: re.compile(r'^\s*%s\s*(,\s*%s\s*)*$' % (_FLOAT_TOK, _FLOAT_TOK)),
+    int: re.compile(r'^\s*%s\s*(,\s*%s\s*)*$' % (_INT_TOK, _INT_TOK)),
+}
+
+def _str2vals(data, typ, dtype=None):
+    """
+    Parse a comma-separated value payload into a numpy array.
+
+    Args
+    ----
+
+    data: str
+        Comma-separated values.
+
+    typ: Python type
+        Element type, one of float, int, or str.
+
+    dtype: numpy dtype
+        Target dtype for numeric payloads.  Defaults to float64/int64
+        based on `typ`.
+
+    Plain numeric payloads are tokenized and converted by
+    `numpy.fromstring` (one C-level pass) instead of a per-element
+    Python loop; quoted or malformed payloads fall back to per-token
+    conversion so bad input raises ValueError instead of being written
+    into the model short or mangled.
+    """
+    if typ is str:
+        return _char_strip(numpy.array(data.split(',')), ' "')
+    if dtype is None:
+        dtype = _NP_DTYPES[typ]
+    regex = _NUMERIC_RES.get(typ)
+    if regex is not None and regex.match(data):
+        try:
+            return _fromstring(data, sep=',', dtype=dtype)
+        except ValueError:  # pragma no cover
+            pass
+    return numpy.array([typ(tok.strip(' "')) for tok in data.split(',')],
+                       dtype=dtype)
+
+# Pre-sorted list_properties replies, keyed by element type.
+_PROPERTIES_CACHE = {}
+
+def _build_properties(typ):
+    """
+    Return sorted tuple of property lines for element type `typ`.
+
+    typ: Python type
+        Element type, one of float, int, or str.
+    """
+    if typ == float:
+        typstr = 'double'
+    elif typ == int:
+        typstr = 'long'
+    else:
+        typstr = 'java.lang.String'
+
+    lines = ['componentType (type=java.lang.Class) (access=g)',
+             'description (type=java.lang.String) (access=g)',
+             'dimensions (type=int[1]) (access=g)',
+             'enumAliases (type=java.lang.String[0]) (access=g)',
+             'enumValues (type=%s[0]) (access=g)' % typstr,
+             'first (type=java.lang.Object) (access=g)',
+             'length (type=int) (access=g)',
+             'lockResize (type=boolean) (access=g)',
+             'numDimensions (type=int) (access=g)',
+             'units (type=java.lang.String) (access=g)']
+
+    if typ != str:
+        lines.extend(['format (type=java.lang.String) (access=g)',
+                      'hasLowerBound (type=boolean) (access=g)',
+                      'hasUpperBound (type=boolean) (access=g)',
+                      'lowerBound (type=%s) (access=g)' % typstr,
+                      'upperBound (type=%s) (access=g)' % typstr])
+
+    return tuple(sorted(lines))
+
+def _format_array(value, fmt='%.16g'):
+    """
+    Return comma-separated string of the entries of the given numpy array.
+
+    Args
+    ----
+
+    fmt: str
+        Format string for entries. Default of '%.16g' assumes float
+        entries.
+
+    The per-entry formatting is done by `numpy.char.mod`, a single C-level
+    loop over the whole buffer, rather than a Python-level loop.
+    """
+    return ', '.join(_char_mod(fmt, value.ravel()).tolist())
+
 def array2str(value, fmt='%.16g'):
     """
     Return a string representation of the given numpy array.
@@ -16,7 +130,7 @@ def array2str(value, fmt='%.16g'):
     """
     return 'bounds[%s] {%s}' % (
              ', '.join(['%d' % dim for dim in value.shape]),
-             ', '.join([fmt % val for val in value.flat]))
+             _format_array(value, fmt))
 
 def str2array(s, dtype=float):
     """
@@ -31,10 +145,11 @@ def str2array(s, dtype=float):
 
     """
     shape = tuple(int(v) for v in s.split(']', 1)[0].split('[',1)[1].split(','))
-    vals = [dtype(v) for v in s.split('{',1)[1].split('}',1)[0].split(',')]
-    logging.info("shape: %s" % str(shape))
-    logging.info("vals: %s" % vals)
-    return numpy.array(vals, dtype=dtype).reshape(shape)
+    vals = _str2vals(s.split('{',1)[1].split('}',1)[0], dtype)
+    if logging.getLogger().isEnabledFor(logging.INFO):
+        logging.info("shape: %s", shape)
+        logging.info("vals: %s", vals)
+    return vals.reshape(shape)
 
 class ArrayBase(VarWrapper):
     """
@@ -59,6 +174,9 @@ class ArrayBase(VarWrapper):
         If True, numpy ndarray, else List.
     """
 
+    __slots__ = ('typ', '_typstr', '_is_array', '_fmt', '_java_typ',
+                 '_dims_cache', '_dims_attr_cache', '_np_dtype')
+
     def __init__(self, sysproxy, name, ext_path, cfg, typ, is_array):
         super(ArrayBase, self).__init__(sysproxy, name, ext_path, cfg)
         self.typ = typ
@@ -69,26 +187,50 @@ class ArrayBase(VarWrapper):
         elif typ is str:
             self._typstr = 'string'
         self._is_array = is_array
+        # Per-element format and Java type name are fixed by `typ`.
+        self._fmt = {float: '%.16g', int: '%d', str: '"%s"'}[typ]
+        self._java_typ = {float: 'double', int: 'long',
+                          str: 'java.lang.String'}[typ]
+        self._dims_cache = {}  # Maps shape to formatted dimensions string.
+        self._dims_attr_cache = {}  # Maps shape to 'dimensions' reply string.
+        # ArrayWrapper overrides this with the wrapped array's actual dtype.
+        self._np_dtype = _NP_DTYPES.get(typ)
 
     @property
     def phx_type(self):
         """ AnalysisServer type string for value. """
         value = self._sysproxy.get(self._name)
         if self._is_array:
-            dims = '[%s]' % ']['.join(['%d' % dim for dim in value.shape])
-            if self.typ == float:
-                return 'double%s' % dims
-            elif self.typ == int:
-                return 'long%s' % dims
-            else:
-                return 'java.lang.String%s' % dims
+            try:
+                dims = self._dims_cache[value.shape]
+            except KeyError:
+                dims = '[%s]' % ']['.join(['%d' % dim for dim in value.shape])
+                self._dims_cache[value.shape] = dims
+            return '%s%s' % (self._java_typ, dims)
         else:
-            if self.typ == float:
-                return 'double[%d]' % len(value)
-            elif self.typ == int:
-                return 'long[%d]' % len(value)
-            else:
-                return 'java.lang.String[%d]' % len(value)
+            return '%s[%d]' % (self._java_typ, len(value))
+
+    def _format_value(self, value):
+        """
+        Return string form of `value`.
+
+        value: ndarray or list
+            Value to format.
+        """
+        fmt = self._fmt
+        if self._is_array and len(value.shape) > 1:
+            valstr = 'bounds[%s] {%s}' % (
+                     ', '.join(['%d' % dim for dim in value.shape]),
+                     _format_array(value, fmt))
+        elif self._is_array:
+            valstr = _format_array(value, fmt)
+        elif len(value):
+            valstr = _format_array(numpy.asarray(value), fmt)
+        else:
+            valstr = ''
+        if self.typ == str:
+            valstr = valstr.encode('string_escape')
+        return valstr
 
     def get(self, attr, path):
         """
@@ -100,35 +242,34 @@ class ArrayBase(VarWrapper):
         path: string
             External reference to property.
         """
-        if attr == self._name or attr == 'value':
-            value = self._sysproxy.get(self._name)
-            if self.typ == float:
-                fmt = '%.16g'
-            elif self.typ == int:
-                fmt = '%d'
-            else:
-                fmt = '"%s"'
-            if self._is_array and len(value.shape) > 1:
-                valstr = 'bounds[%s] {%s}' % (
-                         ', '.join(['%d' % dim for dim in value.shape]),
-                         ', '.join([fmt % val for val in value.flat]))
-            else:
-                valstr = ', '.join([fmt % val for val in value])
-            if self.typ == str:
-                valstr = valstr.encode('string_escape')
-            return valstr
-        elif attr == 'componentType':
+        # Constant attributes don't require a proxy fetch.
+        if attr == 'componentType':
             return self._typstr
+        elif attr in ('enumAliases', 'enumValues'):
+            return ''
+        elif attr == 'lockResize':
+            return 'true' if self._is_array else 'false'
+        elif attr == 'numDimensions' and not self._is_array:
+            return '1'
+        elif attr not in (self._name, 'value', 'dimensions', 'first',
+                          'length', 'numDimensions'):
+            return super(ArrayBase, self).get(attr, path)
+
+        # Remaining attributes share a single fetch of the value.
+        value = self._sysproxy.get(self._name)
+        if attr == self._name or attr == 'value':
+            return self._format_value(value)
         elif attr == 'dimensions':
-            value = self._sysproxy.get(self._name)
             if self._is_array:
-                return ', '.join(['"%d"' % dim for dim in value.shape])
+                try:
+                    return self._dims_attr_cache[value.shape]
+                except KeyError:
+                    dims = ', '.join(['"%d"' % dim for dim in value.shape])
+                    self._dims_attr_cache[value.shape] = dims
+                    return dims
             else:
                 return '"%d"' % len(value)
-        elif attr in ('enumAliases', 'enumValues'):
-            return ''
         elif attr == 'first':
-            value = self._sysproxy.get(self._name)
             if len(value):
                 if self._is_array and len(value.shape) > 1:
                     first = '%s' % value.flat[0]
@@ -140,21 +281,12 @@ class ArrayBase(VarWrapper):
                 first = ''
             return first
         elif attr == 'length':
-            value = self._sysproxy.get(self._name)
             if self._is_array:
                 return '%d' % value.shape[0]
             else:
                 return '%d' % len(value)
-        elif attr == 'lockResize':
-            return 'true' if self._is_array else 'false'
-        elif attr == 'numDimensions':
-            if self._is_array:
-                value = self._sysproxy.get(self._name)
-                return '%d' % len(value.shape)
-            else:
-                return '1'
-        else:
-            return super(ArrayBase, self).get(attr, path)
+        else:  # 'numDimensions' for an array.
+            return '%d' % len(value.shape)
 
     def get_as_xml(self, gzipped):
         """
@@ -162,12 +294,15 @@ class ArrayBase(VarWrapper):
 
         gzipped: bool
             If True, file data is gzipped and then base64 encoded.
+            Only file variables carry gzipped payloads; array values are
+            always emitted as text since that's what clients parse.
         """
+        value = self._sysproxy.get(self._name)
         return '<Variable name="%s" type="%s[]" io="%s" format=""' \
                ' description=%s units="%s">%s</Variable>' \
                % (self._ext_name, self._typstr, self._io, self._xml_desc(),
                   self.get('units', self._ext_path),
-                  self.escape(self.get('value', self._ext_path)))
+                  self.escape(self._format_value(value)))
 
     def set(self, attr, path, valstr, gzipped):
         """
@@ -189,16 +324,14 @@ class ArrayBase(VarWrapper):
             if self.typ == str:
                 valstr = valstr.decode('string_escape')
             if self._is_array:
-                if valstr.startswith('bounds['):
-                    dims, _, rest = valstr[7:].partition(']')
-                    dims = [int(val.strip(' "')) for val in dims.split(',')]
-                    junk, _, rest = rest.partition('{')
-                    data, _, rest = rest.partition('}')
-                    value = numpy.array([self.typ(val.strip(' "'))
-                                         for val in data.split(',')]).reshape(dims)
+                match = _BOUNDS_RE.match(valstr)
+                if match is not None:
+                    dims = numpy.fromstring(match.group(1).replace('"', ' '),
+                                            sep=',', dtype=numpy.intp)
+                    value = _str2vals(match.group(2), self.typ,
+                                      self._np_dtype).reshape(dims)
                 else:
-                    value = numpy.array([self.typ(val.strip(' "'))
-                                         for val in valstr.split(',')])
+                    value = _str2vals(valstr, self.typ, self._np_dtype)
             else:
                 if valstr:
                     value = [self.typ(val.strip(' "'))
@@ -217,32 +350,11 @@ class ArrayBase(VarWrapper):
 
     def list_properties(self):
         """ Return lines listing properties. """
-        if self.typ == float:
-            typstr = 'double'
-        elif self.typ == int:
-            typstr = 'long'
-        else:
-            typstr = 'java.lang.String'
-
-        lines = ['componentType (type=java.lang.Class) (access=g)',
-                 'description (type=java.lang.String) (access=g)',
-                 'dimensions (type=int[1]) (access=g)',
-                 'enumAliases (type=java.lang.String[0]) (access=g)',
-                 'enumValues (type=%s[0]) (access=g)' % typstr,
-                 'first (type=java.lang.Object) (access=g)',
-                 'length (type=int) (access=g)',
-                 'lockResize (type=boolean) (access=g)',
-                 'numDimensions (type=int) (access=g)',
-                 'units (type=java.lang.String) (access=g)']
-
-        if self.typ != str:
-            lines.extend(['format (type=java.lang.String) (access=g)',
-                          'hasLowerBound (type=boolean) (access=g)',
-                          'hasUpperBound (type=boolean) (access=g)',
-                          'lowerBound (type=%s) (access=g)' % typstr,
-                          'upperBound (type=%s) (access=g)' % typstr])
-
-        return sorted(lines)
+        try:
+            return _PROPERTIES_CACHE[self.typ]
+        except KeyError:
+            lines = _PROPERTIES_CACHE[self.typ] = _build_properties(self.typ)
+            return lines
 
 
 class ArrayWrapper(ArrayBase):
@@ -262,6 +374,8 @@ class ArrayWrapper(ArrayBase):
         Used for progress, errors, etc.
     """
 
+    __slots__ = ()
+
     # Map from numpy dtype.kind to scalar converter.
     _converters = {'f':float, 'i':int, 'S':str}
 
@@ -277,5 +391,9 @@ class ArrayWrapper(ArrayBase):
 
         super(ArrayWrapper, self).__init__(sysproxy, name, ext_path, cfg,
                                            typ, is_array=True)
+        if typ is not str:
+            # Parse sets with the wrapped array's own dtype so e.g. a
+            # float32 array isn't silently promoted to float64.
+            self._np_dtype = value.dtype
 
 _register(numpy.ndarray, ArrayWrapper)
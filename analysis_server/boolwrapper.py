@@ -2,6 +2,15 @@
 
 from analysis_server.varwrapper import VarWrapper, _register
 
+# Map from (stripped) value string to Python bool.
+_BOOL_MAP = {'true': True, 'false': False}
+
+# Indexed by bool(value).
+_BOOL_STR = ('false', 'true')
+
+# list_properties replies, keyed by access string.
+_PROPERTIES_CACHE = {}
+
 
 class BoolWrapper(VarWrapper):
     """
@@ -25,7 +34,7 @@ class BoolWrapper(VarWrapper):
             External reference to property.
         """
         if attr == self._name or attr == 'value' or attr == 'valueStr':
-            return 'true' if self._sysproxy.get(self._name) else 'false'
+            return _BOOL_STR[bool(self._sysproxy.get(self._name))]
         else:
             return super(BoolWrapper, self).get(attr, path)
 
@@ -59,13 +68,11 @@ class BoolWrapper(VarWrapper):
         """
         valstr = valstr.strip('"')
         if attr == self._name or attr == 'value':
-            if valstr == 'true':
-                self._sysproxy.set(self._name, True)
-            elif valstr == 'false':
-                self._sysproxy.set(self._name, False)
-            else:
+            value = _BOOL_MAP.get(valstr)
+            if value is None:
                 raise RuntimeError('invalid boolean value %r for <%s>'
                                    % (valstr, path))
+            self._sysproxy.set(self._name, value)
         elif attr in ('valueStr', 'description'):
             raise RuntimeError('cannot set <%s>.' % path)
         else:
@@ -73,8 +80,13 @@ class BoolWrapper(VarWrapper):
 
     def list_properties(self):
         """ Return lines listing properties. """
-        return ('description (type=java.lang.String) (access=g)',
-                'value (type=boolean) (access=%s)' % self._access,
-                'valueStr (type=boolean) (access=g)')
+        try:
+            return _PROPERTIES_CACHE[self._access]
+        except KeyError:
+            lines = _PROPERTIES_CACHE[self._access] = \
+                ('description (type=java.lang.String) (access=g)',
+                 'value (type=boolean) (access=%s)' % self._access,
+                 'valueStr (type=boolean) (access=g)')
+            return lines
 
 _register(bool, BoolWrapper)
@@ -3,9 +3,10 @@ import os
 import sys
 import time
 import logging
-from inspect import getmembers, ismethod, isfunction
+import re
 from itertools import chain
-from fnmatch import fnmatchcase
+from fnmatch import translate
+from operator import attrgetter
 
 from six import iteritems
 
@@ -47,15 +48,39 @@ def _str2list(string):
             lst.append(ss)
     return lst
 
+# Compiled pattern alternations, keyed by pattern tuple.
+_PATTERN_CACHE = {}
+
+def _compile_patterns(patterns):
+    """
+    Return a single compiled regex matching any of the glob `patterns`,
+    or None if there are no patterns.  Compilations are memoized.
+    """
+    key = tuple(patterns)
+    try:
+        return _PATTERN_CACHE[key]
+    except KeyError:
+        if patterns:
+            regex = re.compile('|'.join(translate(p) for p in patterns))
+        else:
+            regex = None
+        _PATTERN_CACHE[key] = regex
+        return regex
+
 def _get_match(name, patterns):
-    for p in patterns:
-        if fnmatchcase(name, p):
-            return name.replace(':', '.')
+    regex = _compile_patterns(patterns)
+    if regex is not None and regex.match(name):
+        return name.replace(':', '.')
+
+# Dotted-path getters, keyed by path.
+_GETTER_CACHE = {}
 
 def _deep_getattr(obj, name):
-    for n in name.split('.'):
-        obj = getattr(obj, n)
-    return obj
+    try:
+        getter = _GETTER_CACHE[name]
+    except KeyError:
+        getter = _GETTER_CACHE[name] = attrgetter(name)
+    return getter(obj)
 
 class _ConfigWrapper(object):
     """
@@ -70,14 +95,21 @@ class _ConfigWrapper(object):
     cfg_path: string
         Path to the configuration file.
 
+    base_dir: string
+        Directory of the configuration file; relative ``filename:``
+        entries are resolved against it.
+
     """
 
-    def __init__(self, classname, config, timestamp):
+    def __init__(self, classname, config, timestamp, base_dir=''):
 
         # Get description info.
         # Get Python class and create temporary instance.
-        for option in _CONFIG_DEFAULTS:
-            setattr(self, _CFG_MAP.get(option, option), config.get('AnalysisServer', option))
+        # Fetch the whole section once rather than a config.get per option.
+        options = dict(config.items('AnalysisServer'))
+        for option, default in iteritems(_CONFIG_DEFAULTS):
+            setattr(self, _CFG_MAP.get(option, option),
+                    options.get(option, default))
 
         self.args = _str2list(self.args)
         self.in_var_patterns = _str2list(self.in_var_patterns)
@@ -86,7 +118,18 @@ class _ConfigWrapper(object):
         self.out_attrs = _str2list(self.out_attrs)
         self.methods = _str2list(self.methods)
 
-        instance = _setup_obj(classname, 'comp', self.filename, args=self.args)
+        # Resolve a relative filename against the config file's own
+        # directory, but only for this temporary instance; callers no
+        # longer chdir around construction, so config reads don't
+        # serialize on a process-wide cwd.  self.filename stays as
+        # configured: started instances resolve it against the server's
+        # working directory, which is where they run.
+        if self.filename and base_dir and not os.path.isabs(self.filename):
+            cfg_filename = os.path.join(base_dir, self.filename)
+        else:
+            cfg_filename = self.filename
+
+        instance = _setup_obj(classname, 'comp', cfg_filename, args=self.args)
 
         # Check for optional diectory path.
         if self.directory:
@@ -113,21 +156,29 @@ class _ConfigWrapper(object):
         self.out_attrs = self._setup_mapping(instance, 'outattr')
 
         # overlapping glob patterns result in outputs
-        for name in self.out_attrs:
-            if name in self.in_attrs:
-                del self.in_attrs
-
-        self.properties = {}
-        self.properties.update(self.inputs)
-        self.properties.update(self.outputs)
-        self.properties.update(self.in_attrs)
-        self.properties.update(self.out_attrs)
+        for name in list(self.in_attrs):
+            if name in self.out_attrs:
+                del self.in_attrs[name]
+
+        # Single pass over the already-built mappings rather than four
+        # successive update() passes.
+        self.properties = dict(chain(iteritems(self.inputs),
+                                     iteritems(self.outputs),
+                                     iteritems(self.in_attrs),
+                                     iteritems(self.out_attrs)))
+
+        # Parallel sorted tuples of (external, internal) paths so hot
+        # iteration paths can bypass dict lookups entirely.
+        self.prop_keys = tuple(sorted(self.properties))
+        self.prop_internal = tuple(self.properties[k] for k in self.prop_keys)
 
         # Get methods.
         methods = self.methods
         self.methods = {}
+        debug = logging.getLogger().isEnabledFor(logging.DEBUG)
         for name in methods:
-            logging.debug('    register %s()', name)
+            if debug:
+                logging.debug('    register %s()', name)
             self.methods[name] = name
 
         instance.cleanup()
@@ -182,7 +233,8 @@ class _ConfigWrapper(object):
         else:
             raise TypeError("bad iotype (%s). Should be one of [invar, outvar, inattr, outattr]" % iotype)
 
-        for name, val in sorted(items, key=lambda x: x[0]):
+        # No need to sort here; consumers sort external names as needed.
+        for name, val in items:
             # Only register if it's a supported type.
             wrapper_class = _find_var_wrapper(val)
             if wrapper_class is None:
@@ -7,11 +7,10 @@ import sys
 import time
 import logging
 import traceback
-from functools import partial
 from cStringIO import StringIO
 
 import xml.etree.cElementTree as ElementTree
-from xml.sax.saxutils import escape
+from xml.sax.saxutils import escape, quoteattr
 
 try:
     import resource
@@ -20,7 +19,8 @@ except ImportError:  # pragma no cover
 
 import openmdao.util.log
 
-from analysis_server.varwrapper import _find_var_wrapper, _float2str
+from analysis_server.varwrapper import _find_var_wrapper, _float2str, \
+                                       _xml_escape
 from analysis_server.monitor import FileMonitor
 
 # import var wrappers so they get registered
@@ -35,29 +35,69 @@ import analysis_server.listwrapper
 from analysis_server.filewrapper import FileWrapper
 
 
-class TreeNode(object):
-    def __init__(self):
-        self.children = {}
 
-    def add_child(self, parts):
-        if parts[0] not in self.children:
-            self.children[parts[0]] = TreeNode()
+# Shared property-listing strings, built once instead of per call.
+_PHX_GROUP_TYPE = 'com.phoenix_int.aserver.PHXGroup'
+_PROP_LINE_FMT = '%s (type=%s) (access=%s)'
+_VAL_LINE_FMT = '%s (type=%s) (access=%s)  vLen=%d  val=%s'
 
-        if len(parts) > 1:
-            self.children[parts[0]].add_child(parts[1:])
+# Template for a full 'invoke' response; filled in with the escaped result.
+# 'download' is always true since we have no idea about side-effects.
+_INVOKE_XML_FMT = """\
+<?xml version="1.0" encoding="UTF-8" standalone="no" ?>\
+<response>\
+<version>100.0</version>\
+<download>true</download>\
+<string>%s</string>\
+</response>"""
+
+# Constants used by ps(); none of these change for the life of the process.
+_PID = os.getpid()
+_COMMAND = os.path.basename(sys.executable)
+_ESC_COMMAND = escape(_COMMAND)
+try:
+    _PAGESIZE = resource.getpagesize()
+except NameError:  # pragma no cover
+    _PAGESIZE = 0  # Not available on Windows.
 
-    def visit(self, prenode, postnode, name=''):
-        prenode(name, self)
-        for cname, node in sorted(self.children.items()):
-            path = '.'.join((name, cname)) if name else cname
-            node.visit(prenode, postnode, path)
-        postnode(name, self)
 
-def create_tree(names):
-    root = TreeNode()
-    for name in names:
-        root.add_child(name.split('.'))
-    return root
+# ps() reply templates.  The idle reply is entirely constant (PID forced
+# to zero to help with testing), so it's rendered once at import time.
+_PS_IDLE_REPLY = """\
+<Processes length='1'>
+ <Process pid='0'>
+  <ParentPID>0</ParentPID>
+  <PercentCPU>0.0</PercentCPU>
+  <Memory>0</Memory>
+  <Time>0</Time>
+  <WallTime>0</WallTime>
+  <Command>%s</Command>
+ </Process>
+</Processes>""" % _ESC_COMMAND
+
+_PS_WIN32_XML_FMT = """\
+<Processes length='1'>
+ <Process pid='%d'>
+  <ParentPID>0</ParentPID>
+  <PercentCPU>0.0</PercentCPU>
+  <Memory>0</Memory>
+  <Time>0</Time>
+  <WallTime>%.1f</WallTime>
+  <Command>%s</Command>
+ </Process>
+</Processes>"""
+
+_PS_RUNNING_XML_FMT = """\
+<Processes length='1'>
+ <Process pid='%d'>
+  <ParentPID>%d</ParentPID>
+  <PercentCPU>%.1f</PercentCPU>
+  <Memory>%d</Memory>
+  <Time>%.1f</Time>
+  <WallTime>%.1f</WallTime>
+  <Command>%s</Command>
+ </Process>
+</Processes>"""
 
 
 class ComponentWrapper(object):
@@ -101,10 +141,102 @@ class ComponentWrapper(object):
         self._monitors = {}  # Maps from monitor_id to monitor.
         self._wrappers = {}  # Maps from internal var path to var wrapper.
         self._path_map = {}  # Maps from external path to (var wrapper, attr).
+        self._path_map_get = self._path_map.get  # Bound for hot lookups.
         self._start = None
         self._rusage = None  # For ps() on UNIX.
+        self._absdir = None  # Component directory, fetched once.
+        self._sorted_props = None  # Sorted external paths, computed lazily.
+        self._prop_trie = None  # Nested-dict trie of paths, computed lazily.
         self._logger = logging.getLogger(name+'_wrapper')
 
+    def _abs_directory(self):
+        """
+        Return the component's absolute directory.  The directory is fixed
+        for the life of the wrapper, so it's fetched over the proxy once.
+        """
+        if self._absdir is None:
+            self._absdir = self._comp.get_abs_directory()
+        return self._absdir
+
+    def _sorted_properties(self):
+        """
+        Return sorted tuple of external property paths.  The configuration
+        is static for the life of the wrapper, so this is computed once.
+        """
+        if self._sorted_props is None:
+            try:
+                self._sorted_props = self._cfg.prop_keys
+            except AttributeError:  # Config predates prop_keys.
+                self._sorted_props = tuple(sorted(self._cfg.properties))
+        return self._sorted_props
+
+    def _prime_wrappers(self):
+        """
+        Build wrappers for all top-level configured properties, fetching
+        their values in a single batched proxy call rather than one round
+        trip per property.  Safe to call repeatedly; already-built wrappers
+        are skipped.
+        """
+        cfg = self._cfg
+        try:
+            pairs = zip(cfg.prop_keys, cfg.prop_internal)
+        except AttributeError:  # Config predates the parallel tuples.
+            properties = cfg.properties
+            pairs = [(k, properties[k]) for k in self._sorted_properties()]
+        todo = [(ext_path, int_path) for ext_path, int_path in pairs
+                if ext_path not in self._path_map]
+        if not todo:
+            return
+        try:
+            vals = self._comp.get_many([int_path for _, int_path in todo])
+        except AttributeError:  # Proxy predates get_many.
+            return
+        for ext_path, int_path in todo:
+            wrapper = self._wrappers.get(int_path)
+            if wrapper is None:
+                val = vals[int_path]
+                wrapper_class = _find_var_wrapper(val)
+                if wrapper_class is None:
+                    raise RuntimeError('%s: unsupported variable type %r.'
+                                       % (ext_path, type(val).__name__))
+                wrapper = wrapper_class(self._comp, int_path, ext_path,
+                                        self._cfg)
+                if wrapper_class is FileWrapper:
+                    wrapper.set_proxy(self._manager)
+                self._wrappers[int_path] = wrapper
+            self._path_map[ext_path] = (wrapper, 'value')
+
+    def _get_prop_trie(self):
+        """
+        Return nested-dict trie of external property paths keyed by dotted
+        components.  A leaf property is marked by a None key mapping to its
+        full external path.  Built once; the configuration is static.
+        """
+        if self._prop_trie is None:
+            trie = {}
+            for ext_path in self._sorted_properties():
+                node = trie
+                for part in ext_path.split('.'):
+                    nxt = node.get(part)
+                    if nxt is None:
+                        nxt = node[part] = {}
+                    node = nxt
+                node[None] = ext_path
+            self._prop_trie = trie
+        return self._prop_trie
+
+    def _has_var(self, ext_path):
+        """
+        Return True if `ext_path` refers to a variable (or a property of
+        one) rather than a subsystem.  Pure lookups; no exceptions raised.
+
+        ext_path: string
+            External reference.
+        """
+        if ext_path in self._path_map or ext_path in self._cfg.properties:
+            return True
+        return ext_path.partition('.')[2] in self._cfg.properties
+
     def _get_var_wrapper(self, ext_path):
         """
         Return '(wrapper, attr)' for `ext_path`.
@@ -112,23 +244,23 @@ class ComponentWrapper(object):
         ext_path: string
             External reference for variable.
         """
-        try:
-            return self._path_map[ext_path]
-        except KeyError:
+        hit = self._path_map_get(ext_path)
+        if hit is not None:
+            return hit
+        else:
             # Determine internal path to variable.
+            props_get = self._cfg.properties.get
             ext_attr = None
-            if ext_path in self._cfg.properties:
-                int_path = self._cfg.properties[ext_path]
+            int_path = props_get(ext_path)
+            if int_path is not None:
                 epath = ext_path
             else:
                 epath, _, ext_attr = ext_path.partition('.')
-                if ext_attr in self._cfg.properties:
-                    int_path = self._cfg.properties[ext_attr]
-                else:
+                int_path = props_get(ext_attr)
+                if int_path is None:
                     raise RuntimeError('no such property <%s>.' % ext_path)
-            try:
-                wrapper = self._wrappers[int_path]
-            except KeyError:
+            wrapper = self._wrappers.get(int_path)
+            if wrapper is None:
                 # Find variable.
                 val = self._comp.get(int_path)
                 wrapper_class = _find_var_wrapper(val)
@@ -193,23 +325,6 @@ class ComponentWrapper(object):
         except Exception:
             self._send_exc(traceback.format_exc(), req_id)
 
-    def _pre_xml(self, lines, gzipped, name, node):
-        if node.children:  # Group
-            if name:
-                lines.append('<Group name="%s">' % name.split('.')[-1])
-            else:
-                lines.append('<Group>')
-        else:
-            vwrapper, attr = self._get_var_wrapper(name)
-            try:
-                lines.append(vwrapper.get_as_xml(gzipped))
-            except Exception as exc:
-                raise type(exc)("Can't get %r: %s %s" % (name, vwrapper,exc))
-
-    def _post_xml(self, lines, gzipped, name, node):
-        if node.children:
-            lines.append('</Group>')
-
     def get_hierarchy(self, req_id, gzipped):
         """
         Return all inputs & outputs as XML.
@@ -221,13 +336,33 @@ class ComponentWrapper(object):
             If True, file data is gzipped and then base64 encoded.
         """
         try:
-            group = ''
-            lines = []
-            lines.append("<?xml version='1.0' encoding='utf-8'?>")
-            tree = create_tree(self._cfg.properties)
-            tree.visit(partial(self._pre_xml, lines, gzipped),
-                       partial(self._post_xml, lines, gzipped))
-            self._send_reply('\n'.join(lines), req_id)
+            buf = StringIO()
+            buf.write("<?xml version='1.0' encoding='utf-8'?>")
+            buf.write('\n<Group>')
+            self._prime_wrappers()  # Batch-fetch values for cold wrappers.
+            cur_parts = []  # Components of the currently open group stack.
+            get_wrap = self._get_var_wrapper
+            for path in self._sorted_properties():
+                new_parts = path.split('.')[:-1]
+                common = 0
+                for old, new in zip(cur_parts, new_parts):
+                    if old != new:
+                        break
+                    common += 1
+                buf.write('\n</Group>' * (len(cur_parts) - common))
+                for part in new_parts[common:]:
+                    buf.write('\n<Group name=%s>' % quoteattr(part))
+                vwrapper, attr = get_wrap(path)
+                try:
+                    buf.write('\n')
+                    buf.write(vwrapper.get_as_xml(gzipped))
+                except Exception as exc:
+                    raise type(exc)("Can't get %r: %s %s"
+                                    % (path, vwrapper, exc))
+                cur_parts = new_parts
+            buf.write('\n</Group>' * len(cur_parts))
+            buf.write('\n</Group>')
+            self._send_reply(buf.getvalue(), req_id)
         except Exception:
             self._send_exc(traceback.format_exc(), req_id)
 
@@ -256,19 +391,15 @@ class ComponentWrapper(object):
             elif isinstance(result, float):
                 reply = _float2str(result)
             elif isinstance(result, basestring):
-                reply = result.encode('string_escape')
+                # Raw replies need control characters escaped for the
+                # line-oriented protocol; full replies are XML-escaped
+                # below, so skip the extra string_escape pass there.
+                reply = result if full else result.encode('string_escape')
             else:
                 reply = str(result)
 
-            # Setting 'download' True since we have no idea about side-effects.
             if full:
-                reply = """\
-<?xml version="1.0" encoding="UTF-8" standalone="no" ?>\
-<response>\
-<version>100.0</version>\
-<download>true</download>\
-<string>%s</string>\
-</response>""" % escape(reply)
+                reply = _INVOKE_XML_FMT % _xml_escape(reply)
 
             self._send_reply(reply, req_id)
         except Exception:
@@ -320,7 +451,7 @@ class ComponentWrapper(object):
             'Raw' mode request identifier.
         """
         try:
-            root = self._comp.get_abs_directory()
+            root = self._abs_directory()
             text_files = self._comp.list_text_files()
             lines = ['%d monitors:' % len(text_files)]
             lines.extend(sorted(text_files))
@@ -344,6 +475,46 @@ class ComponentWrapper(object):
         except Exception:
             self._send_exc(traceback.format_exc(), req_id)
 
+    def _list_properties_structured(self, path):
+        """
+        Return list of ``(name, typ, access, wrapper, ext_path)`` tuples for
+        all properties on a component instance or sub-variable.  `wrapper`
+        is None for property lines that don't map to a variable wrapper.
+
+        path: string
+            External reference.
+        """
+        props = []
+        if self._has_var(path):
+            wrapper, attr = self._get_var_wrapper(path)
+            for line in wrapper.list_properties():
+                name, _, rest = line.partition(' (type=')
+                typ, _, access = rest.partition(') (access=')
+                props.append((name, typ, access[:-1], None, path))
+        else:
+            # Must be a subsystem; walk the trie to its subtree so only
+            # descendants of `path` are visited, not every property.
+            node = self._get_prop_trie()
+            if path:
+                for part in path.split('.'):
+                    node = node.get(part)
+                    if node is None:
+                        return props
+            get_wrap = self._get_var_wrapper
+
+            def visit(node, prefix):
+                ext_path = node.get(None)
+                if ext_path is not None:
+                    wrapper, attr = get_wrap(ext_path)
+                    props.append((prefix, wrapper.phx_type,
+                                  wrapper.phx_access, wrapper, ext_path))
+                for part in sorted(k for k in node if k is not None):
+                    visit(node[part],
+                          '%s.%s' % (prefix, part) if prefix else part)
+
+            visit(node, '')
+        return props
+
     def _list_properties(self, path):
         """
         Lists all available variables and their sub-properties on a component
@@ -352,35 +523,10 @@ class ComponentWrapper(object):
         path: string
             External reference.
         """
-        lines = ['']
-        try:
-            wrapper, attr = self._get_var_wrapper(path)
-        except RuntimeError:
-            # Must be a subsystem.
-            if path:
-                path += '.'
-            length = len(path)
-            groups = set()
-            for ext_path in sorted(self._cfg.properties):
-                if path and not ext_path.startswith(path):
-                    continue
-                name = ext_path[length:]
-                # rest = ext_path[length:]
-                # name, _, rest = rest.partition('.')
-                # if rest:
-                #     if name in groups:
-                #         continue
-                #     groups.add(name)
-                #     typ = 'com.phoenix_int.aserver.PHXGroup'
-                #     access = 'sg'
-                # else:
-                wrapper, attr = self._get_var_wrapper(ext_path)
-                typ = wrapper.phx_type
-                access = wrapper.phx_access
-                lines.append('%s (type=%s) (access=%s)' % (name, typ, access))
-        else:
-            lines.extend(wrapper.list_properties())
-        lines[0] = '%d properties found:' % (len(lines)-1)
+        props = self._list_properties_structured(path)
+        lines = ['%d properties found:' % len(props)]
+        lines.extend(_PROP_LINE_FMT % (name, typ, access)
+                     for name, typ, access, wrapper, ext_path in props)
         return '\n'.join(lines)
 
     def list_values(self, path, req_id):
@@ -395,41 +541,31 @@ class ComponentWrapper(object):
             'Raw' mode request identifier.
         """
         try:
-            lines = []
-            # Get list of properties.
-            props = self._list_properties(path).split('\n')
-            lines.append(props[0])
-            if path:
-                path += '.'
+            # Get structured property list once; no re-parsing of text lines.
+            props = self._list_properties_structured(path)
+            lines = ['%d properties found:' % len(props)]
             # Collect detailed property information.
-            for line in props[1:]:
-                name, typ, access = line.split()
-                if typ == '(type=com.phoenix_int.aserver.PHXGroup)':
+            for name, typ, access, wrapper, ext_path in props:
+                if typ == _PHX_GROUP_TYPE:
                     val = 'Group: %s' % name
-                    lines.append('%s %s %s  vLen=%d  val=%s'
+                    lines.append(_VAL_LINE_FMT
                                  % (name, typ, access, len(val), val))
                 else:
-                    ext_path = path + name
-                    wrapper, attr = self._get_var_wrapper(ext_path)
                     val = wrapper.get('value', ext_path)
-                    lines.append('%s %s %s  vLen=%d  val=%s'
+                    lines.append(_VAL_LINE_FMT
                                  % (name, typ, access, len(val), val))
                     if path:
                         continue  # No sub_props.
 
-                    sub_props = self._list_properties(ext_path).split('\n')
-                    sub_props = sub_props[1:]
+                    sub_props = self._list_properties_structured(ext_path)
                     lines.append('   %d SubProps found:' % len(sub_props))
-                    for line in sub_props:
-                        name, typ, access = line.split()
-                        if typ == '(type=com.phoenix_int.aserver.PHXGroup)':
-                            val = 'Group: %s' % name
-                            lines.append('%s %s %s  vLen=%d  val=%s'
-                                         % (name, typ, access, len(val), val))
+                    for sname, styp, saccess, _, _ in sub_props:
+                        if styp == _PHX_GROUP_TYPE:
+                            val = 'Group: %s' % sname
                         else:
-                            val = wrapper.get(name, ext_path)
-                            lines.append('%s %s %s  vLen=%d  val=%s'
-                                         % (name, typ, access, len(val), val))
+                            val = wrapper.get(sname, ext_path)
+                        lines.append(_VAL_LINE_FMT
+                                     % (sname, styp, saccess, len(val), val))
             self._send_reply('\n'.join(lines), req_id)
         except Exception:
             self._send_exc(traceback.format_exc(), req_id)
@@ -459,7 +595,7 @@ class ComponentWrapper(object):
             'Raw' mode request identifier.
         """
         try:
-            path = os.path.join(self._comp.get_abs_directory(), path)
+            path = os.path.join(self._abs_directory(), path)
             monitor = FileMonitor(self._comp, path, 'r',
                                   req_id, self._send_reply)
             monitor.start()
@@ -494,39 +630,15 @@ class ComponentWrapper(object):
             'Raw' mode request identifier.
         """
         try:
-            pid = os.getpid()
-            command = os.path.basename(sys.executable)
-
             if self._start is None:  # Component not running.
-                # Forcing PID to zero helps with testing.
-                reply = """\
-<Processes length='1'>
- <Process pid='0'>
-  <ParentPID>0</ParentPID>
-  <PercentCPU>0.0</PercentCPU>
-  <Memory>0</Memory>
-  <Time>0</Time>
-  <WallTime>0</WallTime>
-  <Command>%s</Command>
- </Process>
-</Processes>""" % escape(command)
+                reply = _PS_IDLE_REPLY
 
             else:
                 now = time.time()
                 walltime = now - self._start
 
                 if sys.platform == 'win32':  # pragma no cover
-                    reply = """\
-<Processes length='1'>
- <Process pid='%d'>
-  <ParentPID>0</ParentPID>
-  <PercentCPU>0.0</PercentCPU>
-  <Memory>0</Memory>
-  <Time>0</Time>
-  <WallTime>%.1f</WallTime>
-  <Command>%s</Command>
- </Process>
-</Processes>""" % (pid, walltime, escape(command))
+                    reply = _PS_WIN32_XML_FMT % (_PID, walltime, _ESC_COMMAND)
 
                 else:
                     rusage = resource.getrusage(resource.RUSAGE_SELF)
@@ -536,20 +648,11 @@ class ComponentWrapper(object):
                         percent_cpu = cputime / walltime
                     else:
                         percent_cpu = 0.
-                    memory = rusage.maxrss * resource.getpagesize()
+                    memory = rusage.maxrss * _PAGESIZE
 
-                    reply = """\
-<Processes length='1'>
- <Process pid='%d'>
-  <ParentPID>%d</ParentPID>
-  <PercentCPU>%.1f</PercentCPU>
-  <Memory>%d</Memory>
-  <Time>%.1f</Time>
-  <WallTime>%.1f</WallTime>
-  <Command>%s</Command>
- </Process>
-</Processes>""" % (pid, os.getppid(), percent_cpu, memory, cputime, walltime,
-                   escape(command))
+                    reply = _PS_RUNNING_XML_FMT \
+                            % (_PID, os.getppid(), percent_cpu, memory,
+                               cputime, walltime, _ESC_COMMAND)
 
             self._send_reply(reply, req_id)
         except Exception:
@@ -604,29 +707,22 @@ class ComponentWrapper(object):
             'Raw' mode request identifier.
         """
         try:
-            #header, _, xml = xml.partition('\n')
-            logging.info("XML:\n%s" % xml)
-            strm = StringIO()
-            strm.write(xml)
-            strm.seek(0)
-            tree = ElementTree.ElementTree()
-            root = tree.parse(strm)
-            #root = ElementTree.fromstring(xml)
-            # for var in root.findall('Variable'):
-            #     valstr = var.text or ''
-            #     if var.get('gzipped', 'false') == 'true':
-            #         gzipped = True
-            #     else:
-            #         gzipped = False
-            #     try:
-            #         self._set(var.attrib['name'], valstr, gzipped)
-            #     except Exception as exc:
-            #         self._logger.exception("Can't set %r", var.attrib['name'])
-            #         raise type(exc)("Can't set %r from %r: %s"
-            #                         % (var.attrib['name'], valstr[:1000], exc))
-            for elem in tree.iter(tag='Variable'):
-                path = tree.getpath(elem)
-                logging.info("PATH: %s" % path)
+            # Stream-parse so each <Variable> is processed and released as
+            # its end tag arrives, rather than materializing the whole
+            # document up front.
+            for event, var in ElementTree.iterparse(StringIO(xml),
+                                                    events=('end',)):
+                if var.tag != 'Variable':
+                    continue
+                valstr = var.text or ''
+                gzipped = var.get('gzipped', 'false') == 'true'
+                try:
+                    self._set(var.attrib['name'], valstr, gzipped)
+                except Exception as exc:
+                    self._logger.exception("Can't set %r", var.attrib['name'])
+                    raise type(exc)("Can't set %r from %r: %s"
+                                    % (var.attrib['name'], valstr[:1000], exc))
+                var.clear()
             self._send_reply('values set', req_id)
         except Exception:
             self._send_exc(traceback.format_exc(), req_id)
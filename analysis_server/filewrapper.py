@@ -1,14 +1,96 @@
 
+import os
 import base64
+import binascii
 import cStringIO
 import gzip
+
+try:
+    # SIMD-accelerated drop-in replacement for the stdlib codec; file
+    # transfers are dominated by base64 time, so use it when available.
+    import pybase64 as _b64
+except ImportError:
+    _b64 = base64
+_b64encode = _b64.b64encode
+_b64decode = _b64.b64decode
 import logging
 import mimetypes
+import zlib
 from multiprocessing.managers import RemoteError
 
 from openmdao.core.fileref import FileRef
 from analysis_server.varwrapper import VarWrapper, _register
 
+# Shared module logger; avoids a per-instance attribute walk and bound
+# method build on every warning in tight error loops.
+_log = logging.getLogger(__name__)
+
+# 256-entry table reproducing Python 2's string_escape encoding rules,
+# built once so escaping is a table lookup per byte instead of codec
+# machinery with per-character branching.
+_ESCAPE_TABLE = []
+for _b in range(256):
+    _c = chr(_b)
+    if _c == '\\':
+        _ESCAPE_TABLE.append('\\\\')
+    elif _c == '\t':
+        _ESCAPE_TABLE.append('\\t')
+    elif _c == '\n':
+        _ESCAPE_TABLE.append('\\n')
+    elif _c == '\r':
+        _ESCAPE_TABLE.append('\\r')
+    elif _c == "'":
+        _ESCAPE_TABLE.append("\\'")
+    elif _b < 32 or _b > 126:
+        _ESCAPE_TABLE.append('\\x%02x' % _b)
+    else:
+        _ESCAPE_TABLE.append(_c)
+del _b, _c
+
+# XML template for get_as_xml replies, parsed by % once per call rather
+# than rebuilt from adjacent literals each time.
+_FILE_XML_FMT = '<Variable name="%s" type="file" io="%s" description=%s' \
+                ' isBinary="%s" fileName="%s"%s>%s</Variable>'
+
+# File attributes that exist but may not be set.
+_READONLY_ATTRS = frozenset(('description', 'isBinary', 'mimeType',
+                             'name', 'nameCoded', 'url'))
+
+# Memoized mime-type guesses, keyed by lowercase extension.  Many
+# wrappers share a handful of extensions, so guess each one only once.
+_MIME_CACHE = {}
+
+def _guess_mime(ext):
+    """
+    Return guessed mime type for (lowercase) extension `ext`, or None.
+
+    ext: string
+        File extension, including the leading dot.
+    """
+    try:
+        return _MIME_CACHE[ext]
+    except KeyError:
+        typ = _MIME_CACHE[ext] = \
+            mimetypes.guess_type('x' + ext, strict=False)[0]
+        return typ
+
+# Deletion table of every byte outside the base64 alphabet; used only
+# when a padding-corrected decode still fails.
+_B64_ALPHABET = ('ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+                 'abcdefghijklmnopqrstuvwxyz0123456789+/=')
+_NON_B64 = ''.join(chr(b) for b in range(256)
+                   if chr(b) not in _B64_ALPHABET)
+
+def _string_escape(data):
+    """
+    Return `data` escaped per the string_escape codec rules.
+
+    data: string
+        Raw text-file contents.
+    """
+    return ''.join(map(_ESCAPE_TABLE.__getitem__, bytearray(data)))
+
+
 class FileWrapper(VarWrapper):
     """
     Wrapper for `File` providing ``PHXRawFile`` interface.
@@ -24,24 +106,47 @@ class FileWrapper(VarWrapper):
 
     """
 
+    __slots__ = ('_proxy', '_cached_binary', '_cached_filename')
+
     def __init__(self, sysproxy, name, ext_path, cfg):
         super(FileWrapper, self).__init__(sysproxy, name, ext_path, cfg)
         self._proxy = None
+        self._cached_binary = None
+        self._cached_filename = None
+        # Prime the cache so isBinary/name queries (polled by every
+        # listValues sweep) never cost a proxy round trip.
+        self._fetch()
+
+    def _fetch(self):
+        """
+        Return the FileRef after one proxy round trip, memoizing its
+        binary flag and filename -- both fixed once the variable is
+        configured.
+        """
+        file_ref = self._sysproxy.get(self._name)
+        if file_ref is not None:
+            self._cached_binary = file_ref.meta.get('binary', False)
+            self._cached_filename = file_ref._abspath()
+        return file_ref
+
+    def invalidate(self):
+        """ Clear cached FileRef info if the underlying file is rebound. """
+        self._cached_binary = None
+        self._cached_filename = None
 
     @property
     def binary(self):
         """ True if this file is binary. """
-        file_ref = self._sysproxy.get(self._name)
-        if file_ref is not None:
-            return file_ref.meta.get('binary', False)
-        return False
+        if self._cached_binary is None:
+            self._fetch()
+        return bool(self._cached_binary)
 
     @property
     def filename(self):
         """ Name of file """
-        file_ref = self._sysproxy.get(self._name)
-        return file_ref._abspath()
-        return name
+        if self._cached_filename is None:
+            self._fetch()
+        return self._cached_filename
 
     @property
     def phx_type(self):
@@ -57,6 +162,92 @@ class FileWrapper(VarWrapper):
         """
         self._proxy = proxy
 
+    def _read_raw(self, file_ref, path):
+        """
+        Return raw contents of `file_ref`, or None if unreadable.  Uses
+        the already-fetched `file_ref` so no further proxy traffic is
+        needed.
+
+        file_ref: FileRef
+            Reference to the file to read, or None.
+
+        path: string
+            External reference, for logging.
+        """
+        if file_ref is None:
+            return None
+        try:
+            with file_ref.open('r') as inp:
+                # Read with the exact size so the buffer is allocated
+                # once instead of grown by doubling.
+                try:
+                    size = os.fstat(inp.fileno()).st_size
+                except (AttributeError, OSError):
+                    return inp.read()
+                return inp.read(size)
+        except IOError as exc:
+            if _log.isEnabledFor(logging.WARNING):
+                _log.warning('get %s.value: %r', path, exc)
+            return None
+        except RemoteError as exc:
+            if 'IOError' in str(exc):
+                if _log.isEnabledFor(logging.WARNING):
+                    _log.warning('get %s.value: %r', path, exc)
+                return None
+            else:
+                raise
+
+    def _read_value(self, file_ref, path):
+        """
+        Return encoded contents of `file_ref`, or '' if unreadable.
+
+        file_ref: FileRef
+            Reference to the file to read, or None.
+
+        path: string
+            External reference, for logging.
+        """
+        data = self._read_raw(file_ref, path)
+        if data is None:
+            return ''
+        if file_ref.meta.get('binary'):
+            return _b64encode(data)
+        else:
+            return _string_escape(data)
+
+    def _get_value(self, path):
+        """ Return encoded file contents. """
+        return self._read_value(self._sysproxy.get(self._name), path)
+
+    def _get_isbinary(self, path):
+        """ Return 'true'/'false' binary flag. """
+        return 'true' if self.binary else 'false'
+
+    def _get_mime(self, path):
+        """ Return mime type guessed from the file's extension. """
+        file_ref = self._sysproxy.get(self._name)
+        if file_ref is None:
+            return ''
+        typ = _guess_mime(os.path.splitext(file_ref.path)[1].lower())
+        if typ is not None:
+            return typ
+        elif file_ref.meta.get('binary'):
+            return 'application/octet-stream'
+        else:
+            return 'text/plain'
+
+    def _get_name(self, path):
+        """ Return absolute filename. """
+        return self.filename
+
+    # attr -> handler dispatch; one hash lookup replaces the elif ladder.
+    _GETTERS = {'value': _get_value,
+                'isBinary': _get_isbinary,
+                'mimeType': _get_mime,
+                'name': _get_name,
+                'nameCoded': _get_name,
+                'url': lambda self, path: ''}
+
     def get(self, attr, path):
         """
         Return attribute corresponding to `attr`.
@@ -67,45 +258,11 @@ class FileWrapper(VarWrapper):
         path: string
             External reference to property.
         """
-        if attr == self._name or attr == 'value':
-            file_ref = self._sysproxy.get(self._name)
-            if file_ref is None:
-                return ''
-            try:
-                with file_ref.open('r') as inp:
-                    data = inp.read()
-            except IOError as exc:
-                self._logger.warning('get %s.value: %r', path, exc)
-                return ''
-            except RemoteError as exc:
-                if 'IOError' in str(exc):
-                    self._logger.warning('get %s.value: %r', path, exc)
-                    return ''
-                else:
-                    raise
-            if file_ref.meta.get('binary'):
-                return base64.b64encode(data)
-            else:
-                return data.encode('string_escape')
-        elif attr == 'isBinary':
-            return 'true' if self.binary else 'false'
-        elif attr == 'mimeType':
-            file_ref = self._sysproxy.get(self._name)
-            if file_ref is None:
-                return ''
-            typ = mimetypes.guess_type(file_ref.path, strict=False)[0]
-            if typ is not None:
-                return typ
-            elif file_ref.meta.get('binary'):
-                return 'application/octet-stream'
-            else:
-                return 'text/plain'
-        elif attr == 'name':
-            return self.filename
-        elif attr == 'nameCoded':
-            return self.filename
-        elif attr == 'url':
-            return ''
+        fn = self._GETTERS.get(attr)
+        if fn is not None:
+            return fn(self, path)
+        elif attr == self._name:
+            return self._get_value(path)
         else:
             return super(FileWrapper, self).get(attr, path)
 
@@ -116,49 +273,40 @@ class FileWrapper(VarWrapper):
         gzipped: bool
             If True, file data is gzipped and then base64 encoded.
         """
-        file_ref = self._sysproxy.get(self._name)
-        filename = self.filename
+        # One proxy round trip; binary flag and filename derive locally.
+        file_ref = self._fetch()
+        if file_ref is not None:
+            binary = self._cached_binary
+            filename = self._cached_filename
+        else:
+            binary = False
+            filename = ''
         data = zipped = ''
 
         if gzipped:
-            file_ref = self._sysproxy.get(self._name)
             if file_ref is not None:
-                try:
-                    with file_ref.open('r') as inp:
-                        data = inp.read()
-                except IOError as exc:
-                    self._logger.warning('get %s.value: %r',
-                                         self._ext_path, exc)
-                except RemoteError as exc:
-                    if 'IOError' in str(exc):
-                        self._logger.warning('get %s.value: %r',
-                                             self._ext_path, exc)
-                    else:
-                        raise
-                else:
-                    if not file_ref.meta.get('binary'):
-                        gz_data = cStringIO.StringIO()
-                        with gzip.GzipFile(mode='wb', fileobj=gz_data) as gz_file:
-                            gz_file.write(data)
-                        data = gz_data.getvalue()
-                        zipped = ' gzipped="true"'
-                data = base64.b64encode(data)
-                chunks = []
-                chunk = data[:76]
-                while chunk:
-                    chunks.append(chunk)
-                    data = data[76:]
-                    chunk = data[:76]
+                data = self._read_raw(file_ref, self._ext_path)
+                if data is None:
+                    data = ''
+                elif not binary:
+                    # wbits=31 emits a gzip wrapper straight from zlib,
+                    # skipping GzipFile's per-write bookkeeping and the
+                    # StringIO intermediate.
+                    co = zlib.compressobj(6, zlib.DEFLATED, 31)
+                    data = co.compress(data) + co.flush()
+                    zipped = ' gzipped="true"'
+                data = _b64encode(data)
+                # One pass over the encoded data; re-slicing the tail per
+                # chunk made this quadratic in the payload size.
+                chunks = [data[i:i+76] for i in xrange(0, len(data), 76)]
                 chunks.append('')
                 data = '\n'.join(chunks)
         else:
-            data = self.escape(self.get('value', self._ext_path))
+            data = self.escape(self._read_value(file_ref, self._ext_path))
 
-        return '<Variable name="%s" type="file" io="%s" description=%s' \
-               ' isBinary="%s" fileName="%s"%s>%s</Variable>' \
-               % (self._ext_name, self._io, self._xml_desc(),
-                  self.get('isBinary', self._ext_path),
-                  filename, zipped, data)
+        return _FILE_XML_FMT % (self._ext_name, self._io, self._xml_desc(),
+                                'true' if binary else 'false',
+                                filename, zipped, data)
 
     def set(self, attr, path, valstr, gzipped):
         """
@@ -177,10 +325,8 @@ class FileWrapper(VarWrapper):
             If True, file data is gzipped and then base64 encoded.
         """
         if attr == self._name or attr == 'value':
-            file_ref = self._sysproxy.get(self._name)
-            filename = file_ref._abspath()
-
-            binary = self.binary
+            file_ref = self._fetch()
+            binary = self._cached_binary if file_ref is not None else False
             if gzipped:
                 valstr = self._decode(valstr)
                 if not binary:
@@ -193,8 +339,8 @@ class FileWrapper(VarWrapper):
                 else:
                     valstr = valstr.strip('"').decode('string_escape')
             self._sysproxy.write(self._name, valstr)
-        elif attr in ('description', 'isBinary', 'mimeType',
-                      'name', 'nameCoded', 'url'):
+            self.invalidate()  # Write may have rebound the FileRef.
+        elif attr in _READONLY_ATTRS:
             raise RuntimeError('cannot set <%s>.' % path)
         else:
             raise RuntimeError('no such property <%s>.' % path)
@@ -202,21 +348,21 @@ class FileWrapper(VarWrapper):
     @staticmethod
     def _decode(data):
         """
-        At times we receive data with incorrect padding. This code will
-        keep truncating the data until it decodes. We hope the (un)gzip
-        process will catch any erroneous result.
+        At times we receive data with incorrect padding.  Remove all
+        whitespace and append the missing '=' padding up front so
+        well-formed inputs decode without entering the exception path;
+        if the decode still fails, strip any bytes outside the base64
+        alphabet and try once more.
 
         data: string
             Data to be decoded.
         """
-        while data:
-            try:
-                data = base64.b64decode(data)
-            except TypeError:
-                data = data[:-1]
-            else:
-                break
-        return data
+        data = data.translate(None, ' \t\r\n')
+        try:
+            return _b64decode(data + '=' * (-len(data) % 4))
+        except (TypeError, binascii.Error):
+            data = data.translate(None, _NON_B64)
+            return _b64decode(data + '=' * (-len(data) % 4))
 
     def list_properties(self):
         """ Return lines listing properties. """
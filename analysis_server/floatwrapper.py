@@ -1,11 +1,21 @@
 
 from analysis_server.varwrapper import VarWrapper, _register, _float2str
 
+# Attributes that exist but may not be set.
+_READONLY_ATTRS = frozenset(('valueStr', 'description', 'enumAliases',
+                             'enumValues', 'format',
+                             'hasLowerBound', 'lowerBound',
+                             'hasUpperBound', 'upperBound', 'units'))
+
 class FloatWrapper(VarWrapper):
     """
     Wrapper for `Float` providing ``PHXDouble`` interface.
     """
 
+    # Static XML prefix, rendered lazily on first get_as_xml call; name,
+    # io, description, and units never change for a given wrapper.
+    __slots__ = ('_xml_prefix',)
+
     @property
     def phx_type(self):
         """ AnalysisServer type string for value. """
@@ -33,11 +43,15 @@ class FloatWrapper(VarWrapper):
         gzipped: bool
             If True, file data is gzipped and then base64 encoded.
         """
-        return '<Variable name="%s" type="double" io="%s" format=""' \
-               ' description=%s units="%s">%s</Variable>' \
-               % (self._ext_name, self._io, self._xml_desc(),
-                  self.get('units', self._ext_path),
-                  self.get('value', self._ext_path))
+        prefix = getattr(self, '_xml_prefix', None)
+        if prefix is None:
+            prefix = self._xml_prefix = \
+                '<Variable name="%s" type="double" io="%s" format=""' \
+                ' description=%s units="%s">' \
+                % (self._ext_name, self._io, self._xml_desc(),
+                   self.get('units', self._ext_path))
+        return '%s%s</Variable>' \
+               % (prefix, _float2str(self._sysproxy.get(self._name)))
 
     def set(self, attr, path, valstr, gzipped):
         """
@@ -58,9 +72,7 @@ class FloatWrapper(VarWrapper):
         valstr = valstr.strip('"')
         if attr == self._name or attr == 'value':
             self._sysproxy.set(self._name, float(valstr))
-        elif attr in ('valueStr', 'description', 'enumAliases', 'enumValues'
-                      'format', 'hasLowerBound', 'lowerBound',
-                      'hasUpperBound', 'upperBound', 'units'):
+        elif attr in _READONLY_ATTRS:
             raise RuntimeError('cannot set <%s>.' % path)
         else:
             raise RuntimeError('no such property <%s>.' % path)
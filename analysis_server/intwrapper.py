@@ -1,11 +1,20 @@
 
 from analysis_server.varwrapper import VarWrapper, _register
 
+# Attributes that exist but may not be set.
+_READONLY_ATTRS = frozenset(('valueStr', 'description', 'enumAliases',
+                             'enumValues', 'hasLowerBound', 'lowerBound',
+                             'hasUpperBound', 'upperBound', 'units'))
+
 class IntWrapper(VarWrapper):
     """
     Wrapper for `Int` providing ``PHXLong`` interface.
     """
 
+    # Static XML prefix, rendered lazily on first get_as_xml call; name,
+    # io, and description never change for a given wrapper.
+    __slots__ = ('_xml_prefix',)
+
     @property
     def phx_type(self):
         """ AnalysisServer type string for value. """
@@ -33,10 +42,14 @@ class IntWrapper(VarWrapper):
         gzipped: bool
             If True, file data is gzipped and then base64 encoded.
         """
-        return '<Variable name="%s" type="long" io="%s" format=""' \
-               ' description=%s>%s</Variable>' \
-               % (self._ext_name, self._io, self._xml_desc(),
-                  self.get('value', self._ext_path))
+        prefix = getattr(self, '_xml_prefix', None)
+        if prefix is None:
+            prefix = self._xml_prefix = \
+                '<Variable name="%s" type="long" io="%s" format=""' \
+                ' description=%s>' \
+                % (self._ext_name, self._io, self._xml_desc())
+        return '%s%s</Variable>' \
+               % (prefix, str(self._sysproxy.get(self._name)))
 
     def set(self, attr, path, valstr, gzipped):
         """
@@ -57,9 +70,7 @@ class IntWrapper(VarWrapper):
         valstr = valstr.strip('"')
         if attr == self._name or attr == 'value':
             self._sysproxy.set(self._name, int(valstr))
-        elif attr in ('valueStr', 'description', 'enumAliases', 'enumValues'
-                      'hasLowerBound', 'lowerBound',
-                      'hasUpperBound', 'upperBound', 'units'):
+        elif attr in _READONLY_ATTRS:
             raise RuntimeError('cannot set <%s>.' % path)
         else:
             raise RuntimeError('no such property <%s>.' % path)
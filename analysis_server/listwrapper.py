@@ -1,7 +1,10 @@
 
-from analysis_server.varwrapper import VarWrapper, _register
+from analysis_server.varwrapper import VarWrapper, _register, _get_metadata
 from analysis_server.arrwrapper import ArrayBase
 
+# Supported List element types.
+_ALLOWED_TYPES = frozenset((float, int, str))
+
 
 class ListWrapper(ArrayBase):
     """
@@ -20,23 +23,25 @@ class ListWrapper(ArrayBase):
         Used for progress, errors, etc.
     """
 
+    __slots__ = ()
+
     def __init__(self, sysproxy, name, ext_path, cfg):
         lst = sysproxy.get(name)
 
         if lst is not None:
-            types = set()
-            for l in lst:
-                types.add(type(l))
-
-            if len(types) > 1:
-                raise TypeError('%s.%s: only one List element type is allowed. '
-                                'This list has types: %s'
-                                 % (sysproxy.get_pathname(), name, list(types)))
-
-            try:
-                typ = types.pop()
-            except KeyError:
-                meta = sysproxy.get_metadata(name)
+            if lst:
+                # Assume the first element's type and verify with a
+                # short-circuiting scan; the type set is only built for
+                # the error message.
+                typ = type(lst[0])
+                if any(type(l) is not typ for l in lst):
+                    types = set(type(l) for l in lst)
+                    raise TypeError('%s.%s: only one List element type is '
+                                    'allowed. This list has types: %s'
+                                     % (sysproxy.get_pathname(), name,
+                                        list(types)))
+            else:
+                meta = _get_metadata(sysproxy, name)
                 if 'element_type' in meta:
                     typ = meta['element_type']
                 else:
@@ -45,7 +50,7 @@ class ListWrapper(ArrayBase):
                                     "metadata."
                                      % (sysproxy.get_pathname(), name))
 
-            if typ not in (float, int, str):
+            if typ not in _ALLOWED_TYPES:
                 raise TypeError('%s.%s: unsupported List element type %s'
                                  % (sysproxy.get_pathname(), name, typ))
         else:
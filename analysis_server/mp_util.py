@@ -431,11 +431,15 @@ def public_methods(obj):
     # Proxy pass-through only happens remotely.
     methods = []
     if isinstance(obj, BaseProxy):  #pragma no cover
-        for name in dir(obj):
-            if name[0] != '_':
-                attr = getattr(obj, name)
-                if inspect.ismethod(attr) or inspect.isfunction(attr):
-                    methods.append(name)
+        # Walk the class dicts rather than getattr-ing every dir() entry;
+        # this avoids triggering descriptors/proxy calls per attribute.
+        seen = set()
+        for klass in type(obj).mro():
+            for name, attr in klass.__dict__.items():
+                if name[0] != '_' and name not in seen:
+                    seen.add(name)
+                    if inspect.ismethod(attr) or inspect.isfunction(attr):
+                        methods.append(name)
 
     # Add special methods for attribute access.
     methods.extend([name for name in SPECIALS if hasattr(obj, name)])
@@ -2,50 +2,158 @@ from __future__ import print_function
 
 import os
 import sys
+import time
 import logging
 import traceback
+from operator import attrgetter
+
+import numpy
 
 from multiprocessing.managers import BaseManager, BaseProxy
 
+try:
+    # Stdlib in Python 3; the 'futures' backport under Python 2.
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    ThreadPoolExecutor = None
+
 from openmdao.core.problem import Problem
 from openmdao.core.fileref import FileRef
 from openmdao.core.group import Group
 from openmdao.util.file_util import DirContext
 import openmdao.util.log
 
+from analysis_server import _statx
+
 try:
     from mpi4py import MPI
 except ImportError:
     MPI = None
 
+# os.scandir reuses the d_type from readdir, so directory checks cost no
+# extra syscall; unavailable before Python 3.5.
+_SCANDIR = getattr(os, 'scandir', None)
+
+# os.pread reads at an offset in one syscall, skipping the lseek and the
+# buffered-file layer; unavailable before Python 3.3.
+_PREAD = getattr(os, 'pread', None)
+
+# posix_fadvise lets fread hint the kernel to prefetch upcoming chunks;
+# unavailable before Python 3.3 and on Windows.
+_FADVISE = getattr(os, 'posix_fadvise', None)
+
+# Lifetime of cached stat results, in seconds.  Clients probe the same
+# path several times in a row (exists/isfile/stat/size), so even a short
+# window collapses most of the syscalls.
+_STAT_TTL = 1.0
+
+# Bound on cached stat entries so the cache can't grow without limit.
+_STAT_CACHE_MAX = 1024
+
+
+def _sniff_text(item):
+    """
+    Return ``(name, is_text)`` for the ``(name, path)`` pair `item`.
+    512 bytes is plenty to spot a NUL in binary data, and bytearray.find
+    dispatches to memchr.  Each call has its own buffer so probes can
+    run concurrently.
+
+    item: tuple
+        ``(name, path)`` of the file to probe.
+    """
+    name, path = item
+    buf = bytearray(512)
+    with open(path, 'rb') as inp:
+        n = inp.readinto(buf)
+    return name, buf.find(b'\x00', 0, n) == -1
+
+
 class ProblemProxy(object):
 
     def init(self, classname, instname, fpath=None, directory='', args=()):
         self.problem = _setup_obj(classname, instname, fpath,
                                   directory, args=args)
         self.system = self.problem.root
+        self._filerefs = {}  # Memoized FileRef lookups, keyed by name.
+        self._stat_cache = {}  # Maps path to (result or OSError, deadline).
+        self._attr_cache = {}  # Maps dotted name to compiled attrgetter.
+        self._setattr_cache = {}  # Maps name to (parent getter, last attr).
+        # Names problem[...] resolves directly; lets get/set dispatch by
+        # membership instead of exception control flow.
+        self._prob_keys = set(self.system.unknowns.keys())
+        self._prob_keys.update(self.system._sysdata.to_abs_pnames)
+        # Bound methods; get/set skip the attribute and descriptor
+        # lookups on self.problem for every access.
+        self._prob_get = self.problem.__getitem__
+        self._prob_set = self.problem.__setitem__
+        # Flat name -> metadata table, built once so client metadata
+        # scans are a single dict lookup instead of a walk of the
+        # to_abs mapping per call.
+        self._meta = meta = {}
+        # Direct numpy views of scalar unknowns; a numeric set writes
+        # the vector buffer in place instead of walking
+        # Problem.__setitem__.
+        self._set_views = views = {}
+        udat = self.system.unknowns._dat
+        for n in self.system.unknowns:
+            acc = udat[n]
+            meta[n] = acc.meta
+            val = getattr(acc, 'val', None)
+            if isinstance(val, numpy.ndarray) and val.size == 1:
+                views[n] = val
+        pdict = self.system._params_dict
+        for n, abs_names in self.system._sysdata.to_abs_pnames.items():
+            if n not in meta:
+                for p in abs_names:
+                    if p in pdict:
+                        meta[n] = pdict[p]
+                        break
         self._logger = logging.getLogger(instname+'_proxy')
+        # Sampled once; spares each stat() an isEnabledFor walk when
+        # DEBUG tracing is off (the usual case).
+        self._log_debug = self._logger.isEnabledFor(logging.DEBUG)
 
     def set(self, name, value):
+        if name in self._prob_keys:
+            view = self._set_views.get(name)
+            if view is not None and isinstance(value, (float, int)):
+                view[...] = value
+                return
+            self._prob_set(name, value)
+            return
         try:
-            self.problem[name] = value
-        except:
-            parts = name.split('.')
-            obj = self.problem
-            for n in parts[:-1]:
-                obj = getattr(obj, n)
-            setattr(obj, parts[-1], value)
+            parent, last = self._setattr_cache[name]
+        except KeyError:
+            prefix, _, last = name.rpartition('.')
+            parent = attrgetter(prefix) if prefix else None
+            self._setattr_cache[name] = (parent, last)
+        try:
+            obj = self.problem if parent is None else parent(self.problem)
+            setattr(obj, last, value)
+        except AttributeError:
+            # Key snapshot may be incomplete; let the problem resolve it.
+            self._prob_set(name, value)
 
     def get(self, name):
+        if name in self._prob_keys:
+            return self._prob_get(name)
         try:
-            ret = self.problem[name]
-            #self._logger.info("returning prob[%s] = %s" % (name,ret))
-            return ret
-        except:
-            obj = self.problem
-            for n in name.split('.'):
-                obj = getattr(obj, n)
-            return obj
+            getter = self._attr_cache[name]
+        except KeyError:
+            getter = self._attr_cache[name] = attrgetter(name)
+        try:
+            return getter(self.problem)
+        except AttributeError:
+            # Key snapshot may be incomplete; let the problem resolve it.
+            return self._prob_get(name)
+
+    def get_many(self, names):
+        """Return dict mapping each name in `names` to its value.  Lets a
+        caller fetch a batch of values in one round trip instead of one
+        call per name.
+        """
+        get = self.get
+        return dict((name, get(name)) for name in names)
 
     def invoke(self, name):
         obj = self.problem
@@ -62,25 +170,68 @@ class ProblemProxy(object):
         return self.problem.pathname
 
     def run(self):
+        self._stat_cache.clear()  # The run may create or replace files.
         self.problem.run()
 
     def write(self, name, value):
-        fileref = self.problem[name]
-        if isinstance(fileref, FileRef):
-            fileref.write(value)
-        else:
-            raise RuntimeError("'%s' is not a FileRef." % name)
+        fileref = self._filerefs.get(name)
+        if fileref is None:
+            fileref = self.problem[name]
+            if not isinstance(fileref, FileRef):
+                raise RuntimeError("'%s' is not a FileRef." % name)
+            self._filerefs[name] = fileref
+        self._stat_cache.clear()  # The write changes file metadata.
+        fileref.write(value)
 
     def fread(self, path, offset, num_bytes):
         """Attempt to read the specified number of bytes from the file with
         the specified path name.
         """
+        if _PREAD is not None:
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                if _FADVISE is not None:
+                    # Monitors stream files in consecutive chunks; ask
+                    # the kernel to read ahead of the next call.
+                    _FADVISE(fd, offset, max(num_bytes * 4, 1 << 20),
+                             os.POSIX_FADV_SEQUENTIAL)
+                    _FADVISE(fd, offset, num_bytes * 4,
+                             os.POSIX_FADV_WILLNEED)
+                return _PREAD(fd, num_bytes, offset)
+            finally:
+                os.close(fd)
         with open(path, 'rb') as f:
             f.seek(offset)
             return f.read(num_bytes)
 
+    def _cached_stat(self, path):
+        """
+        Return ``os.stat(path)``, caching results -- including failures --
+        for a short TTL so repeated probes of the same path don't re-enter
+        the kernel.
+
+        path: string
+            Path to file to interrogate.
+        """
+        now = time.time()
+        entry = self._stat_cache.get(path)
+        if entry is not None and entry[1] > now:
+            result = entry[0]
+            if isinstance(result, OSError):
+                raise result
+            return result
+        if len(self._stat_cache) >= _STAT_CACHE_MAX:
+            self._stat_cache.clear()
+        try:
+            result = os.stat(path)
+        except OSError as exc:
+            self._stat_cache[path] = (exc, now + _STAT_TTL)
+            raise
+        self._stat_cache[path] = (result, now + _STAT_TTL)
+        return result
+
     def check_file(self, path):
-        if not os.path.isfile(path):
+        if not _statx.is_file(path):
             raise OSError("%s not found" % path)
 
     def stat(self, path):
@@ -90,51 +241,68 @@ class ProblemProxy(object):
         path: string
             Path to file to interrogate.
         """
-        self._logger.debug('stat %r', path)
+        if self._log_debug:
+            self._logger.debug('stat %r', path)
         try:
-            return os.stat(path)
+            return self._cached_stat(path)
         except Exception as exc:
-            logging.error('stat %r in %s failed %s',
-                               path, os.getcwd(), exc)
+            if self._logger.isEnabledFor(logging.ERROR):
+                # os.getcwd() is itself a syscall; only pay for it when
+                # the message will actually be emitted.
+                self._logger.error('stat %r in %s failed %s',
+                                   path, os.getcwd(), exc)
             raise
 
     def list_text_files(self):
-        text_files = []
         absdir = self.get_abs_directory()
-        for path in os.listdir(absdir):
-            if os.path.isdir(path) or path.startswith('.'):
-                continue
-            with open(os.path.join(absdir, path), 'rb') as inp:
-                if '\x00' not in inp.read(1 << 12):  # 4KB
-                    text_files.append(path)
+        if _SCANDIR is not None:
+            items = [(entry.name, entry.path) for entry in _SCANDIR(absdir)
+                     if not entry.name.startswith('.') and
+                        not entry.is_dir(follow_symlinks=False)]
+        else:
+            items = []
+            for name in os.listdir(absdir):
+                fullpath = os.path.join(absdir, name)
+                if name.startswith('.') or self.isdir(fullpath):
+                    continue
+                items.append((name, fullpath))
+
+        if ThreadPoolExecutor is not None and len(items) > 1:
+            # read() releases the GIL, so the probes overlap their I/O
+            # wait -- a real win on network filesystems; map preserves
+            # directory order.
+            pool = ThreadPoolExecutor(max_workers=8)
+            try:
+                results = list(pool.map(_sniff_text, items))
+            finally:
+                pool.shutdown()
+        else:
+            results = [_sniff_text(item) for item in items]
 
-        return text_files
+        return [name for name, is_text in results if is_text]
 
     def listdir(self, root):
         return os.listdir(root)
 
     def isdir(self, path):
-        return os.path.isdir(path)
+        return _statx.is_dir(path)
 
     def get_abs_directory(self):
         return self.system._sysdata.absdir
 
     def get_description(self, name):
-        meta = self.get_metadata(name)
-        return meta.get('desc', '')
+        return self._meta.get(name, {}).get('desc', '')
 
     def get_metadata(self, name):
         #self._logger.info("get_metadata(%s)" % name)
-        if name in self.system.unknowns:
-            return self.system.unknowns._dat[name].meta
-        else:
-            pdict = self.system._params_dict # this contains all model params
-            to_abs = self.system._sysdata.to_abs_pnames
-            if name in to_abs:
-                for p in to_abs[name]:
-                    if p in pdict:
-                        return pdict[p]
-        return {}
+        return self._meta.get(name, {})
+
+    def get_all_metadata(self):
+        """Return dict mapping each variable name to its metadata dict.
+        Lets a caller fetch all metadata in one round trip instead of
+        one call per name.
+        """
+        return self._meta
 
     def set_name(self, name):
         self.problem.name = name
@@ -151,6 +319,12 @@ class SysManager(BaseManager):
 SysManager.register('ProblemProxy', ProblemProxy)
 
 
+# Imported wrapper classes keyed by (dirname, modname, classname).  DOE
+# sweeps spawn many identical instances; only the first pays for the
+# sys.path manipulation and import.
+_CLS_CACHE = {}
+
+
 def _setup_obj(classname, instname, filename=None, directory='', args=()):
     # Get Python class and create instance.
 
@@ -166,21 +340,26 @@ def _setup_obj(classname, instname, filename=None, directory='', args=()):
             else:
                 dirname = os.getcwd()
 
-    logging.debug('    prepending %r to sys.path', dirname)
-    sys.path.insert(0, dirname)
-    try:
-        __import__(modname)
-    finally:
-        sys.path.pop(0)
-
-    module = sys.modules[modname]
     # strip categories from classname
     classname = classname.rsplit('/', 1)[-1]
-    try:
-        cls = getattr(module, classname)
-    except AttributeError as exc:
-        raise RuntimeError("Can't get class %r in %r: %r"
-                           % (classname, modname, exc))
+
+    key = (dirname, modname, classname)
+    cls = _CLS_CACHE.get(key)
+    if cls is None:
+        logging.debug('    prepending %r to sys.path', dirname)
+        sys.path.insert(0, dirname)
+        try:
+            __import__(modname)
+        finally:
+            sys.path.pop(0)
+
+        module = sys.modules[modname]
+        try:
+            cls = getattr(module, classname)
+        except AttributeError as exc:
+            raise RuntimeError("Can't get class %r in %r: %r"
+                               % (classname, modname, exc))
+        _CLS_CACHE[key] = cls
 
     with DirContext(dirname):
         try:
@@ -30,7 +30,10 @@ from __future__ import print_function
 
 import os
 import sys
-import ConfigParser
+try:
+    import ConfigParser
+except ImportError:  # Renamed in Python 3.
+    import configparser as ConfigParser
 import getpass
 import inspect
 import logging
@@ -38,12 +41,24 @@ import argparse
 import platform
 import shutil
 import signal
-import SocketServer
+try:
+    import SocketServer
+except ImportError:  # Renamed in Python 3.
+    import socketserver as SocketServer
 import socket
 import threading
+import multiprocessing
+
+try:
+    # Stdlib in Python 3; the 'futures' backport under Python 2.
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    ThreadPoolExecutor = None
 import time
 import traceback
 import fnmatch
+import re
+from bisect import bisect_left
 
 from xml.sax.saxutils import escape
 
@@ -83,10 +98,169 @@ _AS_BUILD = '42968'
 # Maps from command string to command handler.
 _COMMANDS = {}
 
+# Parsed config wrappers keyed by abs path, each entry (mtime, cfg).
+_CFG_CACHE = {}
+
+# Constant 'help' reply, as listed by Analysis Server version: 7.0,
+# build: 42968; built once at import instead of per call.
+_HELP_REPLY = """\
+Available Commands:
+   listComponents,lc [category]
+   listCategories,la [category]
+   describe,d <category/component> [-xml]
+   setServerAuthInfo <serverURL> <username> <password> (NOT IMPLEMENTED)
+   start <category/component> <instanceName> [connector] [queue]
+   end <object>
+   execute,x <objectName>
+   listProperties,list,ls,l [object]
+   listGlobals,lg
+   listValues,lv <object>
+   listArrayValues,lav <object> (NOT IMPLEMENTED)
+   get <object.property>
+   set <object.property> = <value>
+   move,rename,mv,rn <from> <to> (NOT IMPLEMENTED)
+   getIcon <analysisComponent> (NOT IMPLEMENTED)
+   getIcon2 <analysisComponent> (NOT IMPLEMENTED)
+   getVersion
+   getLicense
+   getStatus
+   help,h
+   quit
+   getSysInfo
+   invoke <object.method()> [full]
+   listMethods,lm <object> [full]
+   addProxyClients <clientHost1>,<clientHost2>
+   monitor start <object.property>, monitor stop <id>
+   versions,v category/component
+   ps <object>
+   listMonitors,lo <objectName>
+   heartbeat,hb [start|stop]
+   listValuesURL,lvu <object>
+   getDirectTransfer
+   getByUrl <object.property> <url> (NOT IMPLEMENTED)
+   setByUrl <object.property> = <url> (NOT IMPLEMENTED)
+   setDictionary <xml dictionary string> (xml accepted, but not used)
+   getHierarchy <object.property>
+   setHierarchy <object.property> <xml>
+   deleteRunShare <key> (NOT IMPLEMENTED)
+   getBranchesAndTags (NOT IMPLEMENTED)
+   getQueues <category/component> [full] (NOT IMPLEMENTED)
+   setRunQueue <object> <connector> <queue> (NOT IMPLEMENTED)"""
+
+# Reply templates for 'describe'; the rendered result is memoized per
+# config wrapper, so each registered component formats these once.
+_DESCRIBE_XML_FMT = """\
+<Description>
+ <Version>%s</Version>
+ <Author>%s</Author>
+ <Description>%s</Description>
+ <HelpURL>%s</HelpURL>
+ <Keywords>%s</Keywords>
+ <TimeStamp>%s</TimeStamp>
+ <Checksum>%s</Checksum>
+ <Requirements>%s</Requirements>
+ <hasIcon>%s</hasIcon>
+ <HasVersionInfo>%s</HasVersionInfo>
+</Description>"""
+
+_DESCRIBE_TEXT_FMT = """\
+Version: %s
+Author: %s
+hasIcon: %s
+Description: %s
+Help URL: %s
+Keywords: %s
+Driver: false
+Time Stamp: %s
+Requirements: %s
+HasVersionInfo: %s
+Checksum: %s"""
+
 _DISABLE_HEARTBEAT = False  # If True, no heartbeat replies are sent.
 
 _DBG_LEN = 10000  # Max length of debug log message.
 
+# Recognizers for the simple section/key-value .cfg format; precompiled
+# once so scanning many component configs at startup skips ConfigParser's
+# per-line machinery.
+_SECTION_RE = re.compile(r'^\[([^\]]+)\]\s*$')
+_KV_RE = re.compile(r'^([^:=\s][^:=]*?)\s*[:=]\s*(.*)$')
+
+
+class _FastConfig(object):
+    """
+    Minimal stand-in for :class:`SafeConfigParser` covering the surface
+    consumed by :class:`_ConfigWrapper`.  Key case is preserved, matching
+    ``optionxform = str``.
+
+    sections: dict
+        Maps section name to a dict of options.
+
+    defaults: dict
+        Options merged under every section.
+    """
+
+    def __init__(self, sections, defaults):
+        self._sections = sections
+        self._defaults = defaults
+
+    def sections(self):
+        """ Return list of section names. """
+        return list(self._sections)
+
+    def items(self, section):
+        """ Return list of (option, value) for `section`, with defaults. """
+        data = dict(self._defaults)
+        data.update(self._sections[section])
+        return list(data.items())
+
+    def get(self, section, option):
+        """ Return value for `option` in `section`. """
+        try:
+            return self._sections[section][option]
+        except KeyError:
+            return self._defaults[option]
+
+
+def _fast_cfg_parse(path, defaults):
+    """
+    Parse the key/value config file at `path` with two precompiled
+    regexes, returning a :class:`_FastConfig`.  Returns None for files
+    using features the scanner doesn't handle (line continuations,
+    value interpolation); those fall back to ConfigParser.
+
+    path: string
+        Path to config file.
+
+    defaults: dict
+        Options merged under every section.
+    """
+    with open(path, 'r') as inp:
+        lines = inp.read().splitlines()
+
+    sections = {}
+    current = None
+    for line in lines:
+        stripped = line.strip()
+        if not stripped or stripped[0] in '#;':
+            continue
+        if line[0] in ' \t':
+            return None  # Continuation line.
+        match = _SECTION_RE.match(line)
+        if match is not None:
+            current = sections.setdefault(match.group(1), {})
+            continue
+        match = _KV_RE.match(line)
+        if match is None or current is None:
+            return None  # Not simple key/value.
+        value = match.group(2)
+        if '%(' in value:
+            return None  # Needs ConfigParser interpolation.
+        current[match.group(1)] = value
+
+    return _FastConfig(sections, defaults)
+
+
 def get_open_address():
     """Return an open address to use for a multiprocessing manager."""
     if sys.platform == 'win32':
@@ -117,6 +291,39 @@ class _ThreadedDictContextMgr(object):
         self._lock.release()
 
 
+class _CowDictContextMgr(object):
+    """
+    Share a read-mostly dict among multiple threads.  Readers enter
+    without locking and iterate the current snapshot; writers copy,
+    mutate, and swap the dict reference, which is atomic under the GIL.
+    Readers therefore never block each other or writers.
+    """
+
+    def __init__(self, dct):
+        self._dct = dict(dct)
+        self._lock = threading.Lock()
+        self._sorted_keys = tuple(sorted(self._dct))
+
+    def __enter__(self):
+        return self._dct
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    @property
+    def sorted_keys(self):
+        """ Presorted tuple of keys, rebuilt only on writes. """
+        return self._sorted_keys
+
+    def set(self, key, value):
+        """ Register `value` under `key`. """
+        with self._lock:
+            new = dict(self._dct)
+            new[key] = value
+            self._dct = new
+            self._sorted_keys = tuple(sorted(new))
+
+
 class Server(SocketServer.ThreadingMixIn, SocketServer.TCPServer):
     """
     Server to process client requests. Reads all component configuration files
@@ -150,15 +357,36 @@ class Server(SocketServer.ThreadingMixIn, SocketServer.TCPServer):
             else:
                 break
 
+        # Non-blocking listener lets _handle_request_noblock drain a
+        # burst of pending accepts per select wakeup.
+        self.socket.setblocking(False)
+
         self._allowed_hosts = allowed_hosts or ['127.0.0.1']
         self._num_clients = 0
-        self._components = {}  # Maps from category/component to (cfg, egg_info)
-        self._handlers = {}    # Maps from client address to handler.
-        self._comp_ctx = _ThreadedDictContextMgr(self._components)
-        self._hdlr_ctx = _ThreadedDictContextMgr(self._handlers)
+        # Maps from category/component to (cfg, egg_info).  Read-mostly:
+        # written only at config-load time, so copy-on-write lets the
+        # listComponents/describe paths read without locking.
+        self._comp_ctx = _CowDictContextMgr({})
+        # Maps from client address to handler, sharded by address hash
+        # so connection setup/teardown only contend within a shard.
+        self._hdlr_shards = tuple(_ThreadedDictContextMgr({})
+                                  for _ in range(16))
+        # Bounded pool reused across connections; a connection burst no
+        # longer spawns an OS thread per accept.  Thread-per-connection
+        # remains the fallback when the futures API is unavailable.
+        if ThreadPoolExecutor is not None:
+            try:
+                workers = multiprocessing.cpu_count() * 4
+            except NotImplementedError:  # pragma no cover
+                workers = 16
+            self._executor = ThreadPoolExecutor(max_workers=workers)
+        else:
+            self._executor = None
         #self._credentials = get_credentials()  # For PublicKey servers.
         self._root = os.getcwd()
         self._dir_lock = threading.RLock()
+        self._dir_locks = {}  # Maps directory to its lock.
+        self._dir_locks_guard = threading.Lock()
         self._config_errors = 0
         self._startdir = os.getcwd()
         for config in configs:
@@ -174,15 +402,28 @@ class Server(SocketServer.ThreadingMixIn, SocketServer.TCPServer):
         """ Lock for synchronizing file operations. """
         return self._dir_lock
 
+    def dir_lock_for(self, path):
+        """
+        Return the lock serializing operations in directory `path`, so
+        work in distinct directories proceeds in parallel.
+
+        path: string
+            Directory to be locked.
+        """
+        with self._dir_locks_guard:
+            lock = self._dir_locks.get(path)
+            if lock is None:
+                lock = self._dir_locks[path] = threading.RLock()
+            return lock
+
     @property
     def num_clients(self):
         """ Number of clients. """
         return self._num_clients
 
-    @property
-    def handlers(self):
-        """ Handler map context manager. """
-        return self._hdlr_ctx
+    def handler_shard(self, client_address):
+        """ Handler map shard context manager for `client_address`. """
+        return self._hdlr_shards[hash(client_address) & 15]
 
     @property
     def components(self):
@@ -217,21 +458,36 @@ class Server(SocketServer.ThreadingMixIn, SocketServer.TCPServer):
             Absolute path to config file.
 
         """
-        config = ConfigParser.SafeConfigParser(_CONFIG_DEFAULTS)
-        config.optionxform = str  # Preserve case.
-        files = config.read(path)
-        if not files:
+        path = os.path.abspath(path)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
             raise RuntimeError("Can't read %r" % path)
 
-        directory = os.path.dirname(path)
-        with self.dir_lock:
-            orig = os.getcwd()
-            if directory:
-                os.chdir(directory)
-            try:
-                self._process_config(config, path)
-            finally:
-                os.chdir(orig)
+        entry = _CFG_CACHE.get(path)
+        if entry is not None and entry[0] == mtime:
+            # Unchanged since last parse; re-register the cached wrapper
+            # (building one instantiates the component, which dwarfs the
+            # O(1) mtime check).
+            cfg = entry[1]
+            comp_path = os.path.splitext(
+                            os.path.relpath(path, start=self._cfg_top))[0]
+            self._logger.debug('    registering comp %s (cached)', comp_path)
+            self._comp_ctx.set(comp_path, (cfg, cfg.directory))
+            return
+
+        try:
+            config = _fast_cfg_parse(path, _CONFIG_DEFAULTS)
+        except (IOError, OSError):
+            raise RuntimeError("Can't read %r" % path)
+        if config is None:  # Uses features the fast scanner punts on.
+            config = ConfigParser.SafeConfigParser(_CONFIG_DEFAULTS)
+            config.optionxform = str  # Preserve case.
+            files = config.read(path)
+            if not files:
+                raise RuntimeError("Can't read %r" % path)
+
+        self._process_config(config, path)
 
     def _process_config(self, config, path):
         """
@@ -244,22 +500,71 @@ class Server(SocketServer.ThreadingMixIn, SocketServer.TCPServer):
             Abs path to config file.
 
         """
-        cwd = os.getcwd()
         classname = os.path.splitext(os.path.basename(path))[0]
 
         # Create wrapper configuration object.
+        mtime = os.path.getmtime(path)
         try:
-            cfg = _ConfigWrapper(classname, config, time.ctime(os.path.getmtime(path)))
+            cfg = _ConfigWrapper(classname, config, time.ctime(mtime),
+                                 base_dir=os.path.dirname(path))
         except Exception as exc:
             self._logger.error(traceback.format_exc())
             raise RuntimeError("Bad configuration in %r: %s" % (path,
                                                        traceback.format_exc()))
+        _CFG_CACHE[path] = (mtime, cfg)
 
         comp_path = os.path.splitext(os.path.relpath(path, start=self._cfg_top))[0]
 
         self._logger.debug('    registering comp %s', comp_path)
-        with self.components as comps:
-            comps[comp_path] = (cfg, cfg.directory)
+        self._comp_ctx.set(comp_path, (cfg, cfg.directory))
+
+    def _handle_request_noblock(self):
+        """
+        Overrides superclass to drain up to 8 ready connections per
+        select wakeup.  GUI reconnects arrive in bursts, and accepting
+        one connection per wakeup pays a select round trip for each.
+        """
+        for _ in range(8):
+            try:
+                request, client_address = self.get_request()
+            except socket.error:  # Includes EAGAIN: queue drained.
+                return
+            # Accepted sockets must block for Stream I/O; on some
+            # platforms they inherit the listener's non-blocking flag.
+            request.setblocking(True)
+            if self.verify_request(request, client_address):
+                try:
+                    self.process_request(request, client_address)
+                except Exception:
+                    self.handle_error(request, client_address)
+                    self.shutdown_request(request)
+            else:
+                self.shutdown_request(request)
+
+    def process_request(self, request, client_address):
+        """
+        Overrides :class:`ThreadingMixIn` to service connections from
+        the bounded worker pool instead of one new thread per
+        connection.
+
+        request: socket
+            Connected socket.
+
+        client_address: ``(host, port)``
+            Source of client request.
+        """
+        if self._executor is not None:
+            self._executor.submit(self.process_request_thread,
+                                  request, client_address)
+        else:
+            SocketServer.ThreadingMixIn.process_request(self, request,
+                                                        client_address)
+
+    def server_close(self):
+        """ Overrides superclass to also shut down the worker pool. """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        SocketServer.TCPServer.server_close(self)
 
     # This will be exercised by client side tests.
     def finish_request(self, request, client_address):  # pragma no cover
@@ -281,10 +586,10 @@ class Server(SocketServer.ThreadingMixIn, SocketServer.TCPServer):
         finally:
             self._logger.info('Disconnect %s:%s', host, port)
             self._num_clients -= 1
-            with self.handlers as handlers:
+            with self.handler_shard(client_address) as handlers:
                 try:  # It seems handler.finish() isn't called on disconnect...
                     handlers[client_address].cleanup()
-                except Exception, exc:
+                except Exception as exc:
                     self._logger.warning('Exception during handler cleanup: %r', exc)
 
 
@@ -293,7 +598,7 @@ class _Handler(SocketServer.BaseRequestHandler):
 
     def setup(self):
         """ Initialize before :meth:`handle` is invoked. """
-        with self.server.handlers as handlers:
+        with self.server.handler_shard(self.client_address) as handlers:
             handlers[self.client_address] = self
         self._stream = Stream(self.request)
         self._lock = threading.Lock()  # Synchronize access to reply stream.
@@ -307,6 +612,10 @@ class _Handler(SocketServer.BaseRequestHandler):
         #set_credentials(self.server.credentials)
 
         self._logger = logging.getLogger('handler')
+        # Sampled once per connection; the per-request debug messages
+        # below are gated on this so an INFO-level server skips their
+        # slicing and formatting entirely.
+        self._dbg = self._logger.isEnabledFor(logging.DEBUG)
         formatter = logging.Formatter('%(asctime)s %(levelname)s: %(message)s',
                                       '%b %d %H:%M:%S')
 
@@ -325,26 +634,29 @@ version: %s""" % _VERSION)
                 try:
                     # Get next request.
                     if self._raw:
-                        self._logger.debug('Waiting for raw-mode request...')
+                        if self._dbg:
+                            self._logger.debug('Waiting for raw-mode request...')
                         req, req_id, background = self._stream.recv_request()
-                        text, zero, rest = req.partition('\x00')
-                        if zero:
-                            self._logger.debug('Request: %r <+binary...> (id %s bg %s)',
-                                               text[:_DBG_LEN],
-                                               req_id, background)
-                        else:
-                            trunc = 'truncated ' if len(req) > _DBG_LEN else ''
-                            self._logger.debug('Request: %r (%sid %s bg %s)',
-                                               req[:_DBG_LEN],
-                                               trunc, req_id, background)
+                        if self._dbg:
+                            text, zero, rest = req.partition('\x00')
+                            if zero:
+                                self._logger.debug('Request: %r <+binary...> (id %s bg %s)',
+                                                   text[:_DBG_LEN],
+                                                   req_id, background)
+                            else:
+                                trunc = 'truncated ' if len(req) > _DBG_LEN else ''
+                                self._logger.debug('Request: %r (%sid %s bg %s)',
+                                                   req[:_DBG_LEN],
+                                                   trunc, req_id, background)
                         self._req_id = req_id
                         self._background = background
                     else:
-                        self._logger.debug('Waiting for request...')
+                        if self._dbg:
+                            self._logger.debug('Waiting for request...')
                         req = self._stream.recv_request()
-                        trunc = ' (truncated)' if len(req) > _DBG_LEN else ''
                         # Don't log password!
-                        if not req.startswith('setDictionary'):
+                        if self._dbg and not req.startswith('setDictionary'):
+                            trunc = ' (truncated)' if len(req) > _DBG_LEN else ''
                             self._logger.debug('Request: %r%s',
                                                req[:_DBG_LEN], trunc)
                         self._req_id = None
@@ -354,19 +666,25 @@ version: %s""" % _VERSION)
                     if not req:  # pragma no cover
                         continue
 
-                    # Lookup request handler.
-                    args = req.split()
+                    # Lookup request handler.  Only the command word is
+                    # split off here; tokenizing the whole request is
+                    # wasted work for zero-arg commands and O(payload)
+                    # for commands that parse self._req themselves.
+                    parts = req.split(None, 1)
                     self._req = req
-                    try:
-                        cmd = _COMMANDS[args[0]]
-                    except KeyError:
+                    cmd = _COMMANDS_GET(parts[0])
+                    if cmd is None:
                         self._send_error('command <%s> not recognized'
                                          % req.strip())
                         continue
+                    if len(parts) == 1 or parts[0] in _PARSE_RAW:
+                        args = []
+                    else:
+                        args = parts[1].split()
 
                     # Process request.
                     try:
-                        cmd(self, args[1:])
+                        cmd(self, args)
                     except Exception as exc:
                         self._send_exc(traceback.format_exc())
 
@@ -446,15 +764,16 @@ version: %s""" % _VERSION)
         """
         if self._raw:
             req_id = req_id or self._req_id
-            text, zero, rest = reply.partition('\x00')
-            if zero:
-                self._logger.debug('(req_id %s)\n%s\n<+binary...>',
-                                   req_id, text[:_DBG_LEN])
-            else:
-                trunc = ' truncated' if len(reply) > _DBG_LEN else ''
-                self._logger.debug('(req_id %s%s)\n%s',
-                                   req_id, trunc, reply[:_DBG_LEN])
-        else:
+            if self._dbg:
+                text, zero, rest = reply.partition('\x00')
+                if zero:
+                    self._logger.debug('(req_id %s)\n%s\n<+binary...>',
+                                       req_id, text[:_DBG_LEN])
+                else:
+                    trunc = ' truncated' if len(reply) > _DBG_LEN else ''
+                    self._logger.debug('(req_id %s%s)\n%s',
+                                       req_id, trunc, reply[:_DBG_LEN])
+        elif self._dbg:
             trunc = ' (truncated)' if len(reply) > _DBG_LEN else ''
             self._logger.debug('    %s%s', reply[:_DBG_LEN], trunc)
         with self._lock:
@@ -515,39 +834,26 @@ version: %s""" % _VERSION)
         cfg, directory = comp
         has_version_info = 'false'
 
+        # Config wrappers are immutable once registered, so the rendered
+        # reply is computed once per wrapper; GUIs poll describe often.
         if len(args) > 1 and args[1] == '-xml':
-            self._send_reply("""\
-<Description>
- <Version>%s</Version>
- <Author>%s</Author>
- <Description>%s</Description>
- <HelpURL>%s</HelpURL>
- <Keywords>%s</Keywords>
- <TimeStamp>%s</TimeStamp>
- <Checksum>%s</Checksum>
- <Requirements>%s</Requirements>
- <hasIcon>%s</hasIcon>
- <HasVersionInfo>%s</HasVersionInfo>
-</Description>""" % (cfg.version, escape(cfg.author), escape(cfg.description),
-                     cfg.help_url, ' '.join(cfg.keywords), cfg.timestamp,
-                     cfg.checksum, escape(' '.join(cfg.requirements)),
-                     str(cfg.has_icon).lower(), has_version_info))
+            reply = getattr(cfg, '_cached_xml', None)
+            if reply is None:
+                reply = cfg._cached_xml = _DESCRIBE_XML_FMT \
+                    % (cfg.version, escape(cfg.author), escape(cfg.description),
+                       cfg.help_url, ' '.join(cfg.keywords), cfg.timestamp,
+                       cfg.checksum, escape(' '.join(cfg.requirements)),
+                       str(cfg.has_icon).lower(), has_version_info)
+            self._send_reply(reply)
         else:
-            self._send_reply("""\
-Version: %s
-Author: %s
-hasIcon: %s
-Description: %s
-Help URL: %s
-Keywords: %s
-Driver: false
-Time Stamp: %s
-Requirements: %s
-HasVersionInfo: %s
-Checksum: %s""" % (cfg.version, cfg.author, str(cfg.has_icon).lower(),
-                   cfg.description, cfg.help_url, ' '.join(cfg.keywords),
-                   cfg.timestamp, ' '.join(cfg.requirements),
-                   has_version_info, cfg.checksum))
+            reply = getattr(cfg, '_cached_text', None)
+            if reply is None:
+                reply = cfg._cached_text = _DESCRIBE_TEXT_FMT \
+                    % (cfg.version, cfg.author, str(cfg.has_icon).lower(),
+                       cfg.description, cfg.help_url, ' '.join(cfg.keywords),
+                       cfg.timestamp, ' '.join(cfg.requirements),
+                       has_version_info, cfg.checksum)
+            self._send_reply(reply)
 
     def _end(self, args):
         """
@@ -797,9 +1103,9 @@ version: %s, build: %s""" % (_VERSION, _AS_VERSION, _AS_BUILD))
                              'listComponents,lc')
             return
 
-        with self.server.components as comps:
-            lines = ['%d components found:' % len(comps)]
-            lines.extend(sorted(comps.keys()))
+        names = self.server.components.sorted_keys
+        lines = ['%d components found:' % len(names)]
+        lines.extend(names)
         self._send_reply('\n'.join(lines))
 
     def _heartbeat(self, args):
@@ -839,50 +1145,7 @@ version: %s, build: %s""" % (_VERSION, _AS_VERSION, _AS_BUILD))
                              'help,h')
             return
 
-        # As listed by Analysis Server version: 7.0, build: 42968.
-        self._send_reply("""\
-Available Commands:
-   listComponents,lc [category]
-   listCategories,la [category]
-   describe,d <category/component> [-xml]
-   setServerAuthInfo <serverURL> <username> <password> (NOT IMPLEMENTED)
-   start <category/component> <instanceName> [connector] [queue]
-   end <object>
-   execute,x <objectName>
-   listProperties,list,ls,l [object]
-   listGlobals,lg
-   listValues,lv <object>
-   listArrayValues,lav <object> (NOT IMPLEMENTED)
-   get <object.property>
-   set <object.property> = <value>
-   move,rename,mv,rn <from> <to> (NOT IMPLEMENTED)
-   getIcon <analysisComponent> (NOT IMPLEMENTED)
-   getIcon2 <analysisComponent> (NOT IMPLEMENTED)
-   getVersion
-   getLicense
-   getStatus
-   help,h
-   quit
-   getSysInfo
-   invoke <object.method()> [full]
-   listMethods,lm <object> [full]
-   addProxyClients <clientHost1>,<clientHost2>
-   monitor start <object.property>, monitor stop <id>
-   versions,v category/component
-   ps <object>
-   listMonitors,lo <objectName>
-   heartbeat,hb [start|stop]
-   listValuesURL,lvu <object>
-   getDirectTransfer
-   getByUrl <object.property> <url> (NOT IMPLEMENTED)
-   setByUrl <object.property> = <url> (NOT IMPLEMENTED)
-   setDictionary <xml dictionary string> (xml accepted, but not used)
-   getHierarchy <object.property>
-   setHierarchy <object.property> <xml>
-   deleteRunShare <key> (NOT IMPLEMENTED)
-   getBranchesAndTags (NOT IMPLEMENTED)
-   getQueues <category/component> [full] (NOT IMPLEMENTED)
-   setRunQueue <object> <connector> <queue> (NOT IMPLEMENTED)""")
+        self._send_reply(_HELP_REPLY)
 
     def _invoke(self, args):
         """
@@ -941,16 +1204,18 @@ Available Commands:
             category = ''
 
         lines = set()
-        with self.server.components as comps:
-            #logging.info("CATEGORY: %s" % category)
-            for name in sorted(comps):
-                #logging.info("NAME: %s" % name)
-                if name.startswith(category):
-                    name = name[len(category):]
-                    slash = name.find('/')
-                    if slash > 0:
-                        name = name[:slash]
-                        lines.add(name)
+        names = self.server.components.sorted_keys
+        # Keys sharing the category prefix are contiguous in sorted
+        # order, so jump to the first with bisect and stop at the first
+        # non-match.
+        for i in range(bisect_left(names, category), len(names)):
+            name = names[i]
+            if not name.startswith(category):
+                break
+            name = name[len(category):]
+            slash = name.find('/')
+            if slash > 0:
+                lines.add(name[:slash])
 
         lines = ['%d categories found:' % len(lines)] + list(lines)
         self._send_reply('\n'.join(lines))
@@ -1217,7 +1482,7 @@ Available Commands:
                           name, directory)
 
         # Create component instance.
-        with self.server.dir_lock:
+        with self.server.dir_lock_for(directory or ''):
             manager = SysManager()
             manager.start()
             proxy = manager.ProblemProxy()
@@ -1319,6 +1584,14 @@ Available Commands:
     _COMMANDS['x'] = _execute
 
 
+# Bound once for the per-request dispatch in _Handler.handle.
+_COMMANDS_GET = _COMMANDS.get
+
+# Commands that re-parse self._req themselves; their (possibly huge)
+# payloads are never tokenized by handle().
+_PARSE_RAW = frozenset(('set', 'setHierarchy'))
+
+
 
 
 
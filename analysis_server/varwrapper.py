@@ -7,9 +7,27 @@ import logging
 from xml.sax.saxutils import escape, quoteattr
 import openmdao.util.log
 
+# Single-pass XML escaping table for str.translate.  Interpreters whose
+# str.translate can't map ordinals to replacement strings (byte strings
+# on Python 2) fall back to saxutils.escape and its three replace passes.
+_XML_ESCAPES = {ord('&'): '&amp;', ord('<'): '&lt;', ord('>'): '&gt;'}
+
+try:
+    if 'a&b'.translate(_XML_ESCAPES) == 'a&amp;b':
+        def _xml_escape(s):
+            """ Return `s` with XML markup characters escaped. """
+            return s.translate(_XML_ESCAPES)
+    else:  # pragma no cover
+        _xml_escape = escape
+except TypeError:  # pragma no cover
+    _xml_escape = escape
+
 # Mapping from OpenMDAO variable type to wrapper type.
 _TYPE_MAP = {}
 
+# Memoized _find_var_wrapper results, keyed by value type.
+_WRAPPER_CACHE = {}
+
 def _register(typ, wrapper):
     """
     Register `wrapper` for `typ`.
@@ -22,6 +40,7 @@ def _register(typ, wrapper):
     """
     typename = '%s' % typ.__name__
     _TYPE_MAP[typename] = wrapper
+    _WRAPPER_CACHE.clear()  # Registry changed; drop memoized lookups.
 
 def _find_var_wrapper(val):
     """
@@ -31,11 +50,50 @@ def _find_var_wrapper(val):
         Python value to be checked.
     """
     typ = type(val)
+    try:
+        return _WRAPPER_CACHE[typ]
+    except KeyError:
+        pass
+    wrapper = None
     for klass in typ.mro():
         name = klass.__name__
         if name in _TYPE_MAP:
-            return _TYPE_MAP[name]
-    return None
+            wrapper = _TYPE_MAP[name]
+            break
+    _WRAPPER_CACHE[typ] = wrapper
+    return wrapper
+
+# Dispatch table for attributes whose handling is the same for every
+# wrapper type; one dict lookup replaces a chain of string compares on
+# each VarWrapper.get call.
+_BASE_GETTERS = {
+    'description': lambda self: self._esc_desc,
+    'units': lambda self: self._meta.get('units', ''),
+    'format': lambda self: 'null',
+    'enumAliases': lambda self: '',
+    'enumValues': lambda self: '',
+}
+
+def _get_metadata(sysproxy, name):
+    """
+    Return metadata dict for `name`, fetching the proxy's full metadata
+    table on first use so building wrappers for a component costs one
+    round trip in total rather than one per variable.
+
+    sysproxy: proxy
+        Proxy to remote parent System.
+
+    name: string
+        Name of variable.
+    """
+    all_meta = getattr(sysproxy, '_all_meta', None)
+    if all_meta is None:
+        try:
+            all_meta = sysproxy.get_all_metadata()
+        except AttributeError:  # Server predates get_all_metadata.
+            return sysproxy.get_metadata(name)
+        sysproxy._all_meta = all_meta
+    return all_meta.get(name, {})
 
 def _float2str(val):
     """
@@ -62,6 +120,11 @@ class VarWrapper(object):
 
     """
 
+    # Wrappers are created one per variable, potentially thousands per
+    # problem; slots drop the per-instance dict and speed attribute access.
+    __slots__ = ('_sysproxy', '_name', '_ext_path', '_ext_name',
+                 '_access', '_io', '_meta', '_esc_desc', '_logger')
+
     def __init__(self, sysproxy, name, ext_path, cfg):
         self._sysproxy = sysproxy
         self._name = name
@@ -69,7 +132,9 @@ class VarWrapper(object):
         self._ext_name = ext_path.rpartition('.')[2]
         self._access = 'sg' if ext_path in cfg.inputs else 'g'
         self._io = 'input' if ext_path in cfg.inputs  else 'output'
-        self._meta = sysproxy.get_metadata(name)
+        self._meta = _get_metadata(sysproxy, name)
+        # Description is static; escape it once rather than per get() call.
+        self._esc_desc = self._meta.get('desc', '').encode('string_escape')
         self._logger = logging.getLogger(name)
 
     @property
@@ -87,9 +152,9 @@ class VarWrapper(object):
         path: string
             External reference to property.
         """
-        if attr == 'description':
-            valstr = self._sysproxy.get_description(attr)
-            return valstr.encode('string_escape')
+        getter = _BASE_GETTERS.get(attr)
+        if getter is not None:
+            return getter(self)
         elif attr == 'hasUpperBound' and self.typ != str:
             return 'true' if 'upper' in self._meta else 'false'
         elif attr == 'upperBound' and self.typ != str:
@@ -98,14 +163,6 @@ class VarWrapper(object):
             return 'true' if 'lower' in self._meta else 'false'
         elif attr == 'lowerBound' and self.typ != str:
             return str(self._meta.get('lower', 0))
-        elif attr == 'units':
-            return self._meta.get('units', '')
-        elif attr == 'format':
-            return 'null'
-        elif attr == 'enumAliases':
-            return ''
-        elif attr == 'enumValues':
-            return ''
         else:
             raise RuntimeError('no such property <%s>.' % path)
 
@@ -113,4 +170,4 @@ class VarWrapper(object):
         return quoteattr(self._meta.get('desc', self._ext_path))
 
     def escape(self, s):
-        return escape(s)
+        return _xml_escape(s)